@@ -1,9 +1,12 @@
 import json
+from itertools import islice
 
 with open("prompts.jsonl", "r", encoding="utf-8") as f:
-    lines = f.readlines()
+    # Stream up to the 10th line instead of reading the whole file into memory
+    line = next(islice(f, 9, 10), None)
 
-for idx,line in enumerate(lines[9:10]):
-    key = f"Resume_{idx+10}"
+# A file with fewer than 10 lines has nothing to print
+if line is not None:
+    key = "Resume_10"
     data = json.loads(line)
     print(data[key][0])
\ No newline at end of file
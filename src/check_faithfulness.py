@@ -1,36 +1,58 @@
-import asyncio
-import torch
-from transformers import AutoModelForSequenceClassification
-"""
-def check_faithfulness(retrieved_contexts: str, response: str):
-    
-    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import List, Tuple
+
+# Number of (retrieved_contexts, response) pairs scored in one forward pass
+BATCH_SIZE = 32
+
+@lru_cache(maxsize=1)
+def _get_hhem():
+    """
+    Loads Vectara's HHEM classifier once and returns the same instance on every later call.
+
+    Returns:
+        The HHEM model, in eval mode on the best available device.
+    """
+    # Deferred so that importing this module does not pay for torch/transformers or create a CUDA context
+    import torch
+    from transformers import AutoModelForSequenceClassification
 
-    model = AutoModelForSequenceClassification.from_pretrained('vectara/hallucination_evaluation_model', trust_remote_code=True)
-
-    model.to(device)
-    
-    pairs = [ (retrieved_contexts, response) ]
-    
-    score = model.predict(pairs)
-
-    return score
-"""
-from ragas.dataset_schema import SingleTurnSample
-from ragas.metrics import FaithfulnesswithHHEM
-from ragas.llms import BaseRagasLLM
-
-async def check_faithfulness(retrieved_contexts: str, response: str):
-    sample = SingleTurnSample(
-        user_input="Evaluate the candidate's suitability for the Basel Business Analyst role.",
-        response="You are classified as Not Fit for this Basel Business Analyst role because your experience...",
-        retrieved_contexts=[
-            "Experienced professional with 16 years in accounting, business management, and administration. Most recent role as Accountant at Aspirus. Skills include Accounting, Excel, Project Management, Staff Management."
-        ]
-    )
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    llm = BaseRagasLLM().generate(prompt=sample.user_input, retrieved_contexts=sample.retrieved_contexts)
-    scorer = FaithfulnesswithHHEM(llm=llm, device=device)
-    score = await scorer.single_turn_ascore(sample)
-    print(f"Faithfulness Score: {score}")
-    return score
+
+    # Half precision halves activation memory and bandwidth; HHEM is T5-based and overflows in fp16, so use bf16 where supported
+    dtype = torch.bfloat16 if device.type == "cuda" and torch.cuda.is_bf16_supported() else torch.float32
+
+    model = AutoModelForSequenceClassification.from_pretrained('vectara/hallucination_evaluation_model', trust_remote_code=True, torch_dtype=dtype)
+    model.to(device).eval()
+
+    if device.type == "cuda":
+        # Compile only the T5 module that predict() runs; the tokenizer call in predict() itself would break the graph.
+        # Dynamic shapes avoid a recompile for every padded batch length
+        model.t5 = torch.compile(model.t5, dynamic=True)
+
+    return model
+
+async def check_faithfulness(pairs: List[Tuple[str, str]], batch_size: int = BATCH_SIZE) -> List[float]:
+    """
+    Scores how faithful each response is to its retrieved contexts with Vectara's HHEM classifier.
+    Pairs are scored in batches so that each forward pass processes batch_size pairs at once.
+
+    Args:
+        pairs (List[Tuple[str, str]]): The (retrieved_contexts, response) pairs to score.
+        batch_size (int): The number of pairs scored per forward pass.
+
+    Returns:
+        List[float]: One score per pair, from 0 (hallucinated) to 1 (consistent with the contexts).
+    """
+    import torch
+
+    model = _get_hhem()
+    scores: List[float] = []
+
+    with torch.inference_mode():
+        for start in range(0, len(pairs), batch_size):
+            batch = pairs[start:start + batch_size]
+            scores.extend(model.predict(batch).float().tolist())
+
+    return scores
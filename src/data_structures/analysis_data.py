@@ -1,6 +1,6 @@
 from typing import Dict, List, Any
 from enum import Enum
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from .resume_data import Resume
 from .jd_data import JobDescription
 
@@ -16,6 +16,8 @@ class ResumeAnalysis(BaseModel):
     """
     Pydantic model to represent the analysis of the resume.
     """
+    model_config = ConfigDict(frozen=True)
+
     summary: str = Field(description="Summary of the resume that only includes the most relevant information. For example: Name, Current Position, Current Company, Current Location, Years of Experience, top 5 skills.")
     classification: ClassEnum = Field(description="Classification of the resume. For example: Good Fit, Not Fit, Partial Fit")
     overall_score: float = Field(description="Overall score of the resume on a scale of 1 to 100 based on how well it matches the job description. For example: 85")
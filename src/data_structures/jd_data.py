@@ -1,10 +1,12 @@
 from typing import Dict, List, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 class Education(BaseModel):
     """
     Pydantic model to represent the education requirements in the job description.
     """
+    model_config = ConfigDict(frozen=True)
+
     required_degree: List[str] = Field(description="Required degree for the job. For example: BS, MS, PhD, MBA etc.")
     preferred_degree: List[str] = Field(description="Preferred degree for the job. For example: BS, MS, PhD, MBA etc.")
     required_level: List[str] = Field(description="Required level for the job. For example: Diploma, Bachelor's, Master's, Doctoral, etc.")
@@ -16,6 +18,8 @@ class Experience(BaseModel):
     """
     Pydantic model to represent the experience mentioned in the job description.
     """
+    model_config = ConfigDict(frozen=True)
+
     required_years_in_total: int = Field(description="Required total years of experience for the job")
     preferred_years_in_total: int = Field(description="Preferred total years of experience for the job")
 
@@ -23,6 +27,8 @@ class Skills(BaseModel):
     """
     Pydantic model to represent the skills listed in the job description.
     """
+    model_config = ConfigDict(frozen=True)
+
     required_technical: List[str] = Field(description="Required technical skills for the job")
     preferred_technical: List[str] = Field(description="Preferred technical skills for the job")
     required_soft: List[str] = Field(description="Required soft skills for the job")
@@ -36,6 +42,8 @@ class OtherInformation(BaseModel):
     """
     Pydantic model to represent other information mentioned in the job description.
     """
+    model_config = ConfigDict(frozen=True)
+
     salary: str = Field(description="Salary range for the job")
     benefits: List[str] = Field(description="Benefits mentioned in the job description")
     bonus_qualifications: List[str] = Field(description="Bonus qualifications mentioned in the job description that are not mandatory but potentially beneficial")
@@ -45,6 +53,8 @@ class JobDescription(BaseModel):
     """
     Pydantic model to represent the job description.
     """
+    model_config = ConfigDict(frozen=True)
+
     job_title: str = Field(description="Title/Position/Role of the job. For example: Software Engineer, Data Scientist, etc.")
     location: List[str] = Field(description="Location of the job")
     job_type: str = Field(description="Type of job. For example: Full-time, Part-time, Contract, etc.")
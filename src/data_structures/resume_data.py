@@ -1,10 +1,12 @@
 from typing import Dict, List, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 class Education(BaseModel):
     """
     Pydantic model to represent the education of the resume.
     """
+    model_config = ConfigDict(frozen=True)
+
     degree: List[str] = Field(description="Degree of the education. For example: BS, MS, PhD, MBA, etc.")
     level: List[str] = Field(description="Level of the education. For example: Diploma, Bachelor's, Master's, Doctoral, etc.")
     major: List[str] = Field(description="Major of the education. For example: Computer Science, Business Administration, etc.")
@@ -13,6 +15,8 @@ class Experience(BaseModel):
     """
     Pydantic model to represent the experience of the resume.
     """
+    model_config = ConfigDict(frozen=True)
+
     years_in_total: int = Field(description="Total years of experience")
     years_in_current_company: int = Field(description="Years of experience in the current company")
     current_employer: List[str] = Field(description="Name of the company where the candidate is currently employed or the most recent employer")
@@ -23,6 +27,8 @@ class Skills(BaseModel):
     """
     Pydantic model to represent the skills of the resume.
     """
+    model_config = ConfigDict(frozen=True)
+
     technical: List[str] = Field(description="Technical skills")
     soft: List[str] = Field(description="Soft skills")
     languages: List[str] = Field(description="Languages spoken")
@@ -32,6 +38,8 @@ class OtherInformation(BaseModel):
     """
     Pydantic model to represent other information of the resume.
     """
+    model_config = ConfigDict(frozen=True)
+
     awards_and_achievements: List[str] = Field(description="Awards and achievements of the candidate. For example: Employee of the Month, Best Project Award, Dean's List, Fellowships, etc.")
     publications: List[str] = Field(description="Publications by the candidate")
     projects: List[str] = Field(description="Projects worked on by the candidate")
@@ -42,6 +50,8 @@ class ContactInformation(BaseModel):
     """
     Pydantic model to represent the contact information of the resume.
     """
+    model_config = ConfigDict(frozen=True)
+
     email: List[str] = Field(description="Email address of the candidate")
     phone: List[str] = Field(description="Phone number of the candidate")
     address: List[str] = Field(description="Address of the candidate")
@@ -51,6 +61,8 @@ class Qualifications(BaseModel):
     """
     Pydantic model to represent the qualifications of the resume.
     """
+    model_config = ConfigDict(frozen=True)
+
     SKILLS: Skills
     EDUCATION: Education
     EXPERIENCE: Experience
@@ -61,6 +73,8 @@ class Resume(BaseModel):
     """
     Pydantic model to represent the resume.
     """
+    model_config = ConfigDict(frozen=True)
+
     summary: str = Field(description="Summary of the resume")
     job_title: str = Field(description="Current Job title of the candidate or the position they are applying for")
     qualifications: Qualifications = Field(description="Qualifications of the resume")
\ No newline at end of file
@@ -1,24 +1,69 @@
 import argparse
+import asyncio
+import csv
 import json
-import pandas as pd
 import sys
 from pathlib import Path
-from tqdm import tqdm
+from tqdm.asyncio import tqdm
 from typing import List, Dict, Any, Optional
 
 # Add the parent directory to the Python path
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 
-from utils.prompts import SYSTEM_PROMPT, get_distill_user_prompt
+from utils.prompts import SYSTEM_PROMPT_SHORT, get_distill_user_prompt
 from utils.parse_resume import parse_resume
 from data_structures.analysis_data import ResumeAnalysis, ClassEnum
 from data_structures.resume_data import Resume
 from data_structures.jd_data import JobDescription
-from utils.get_teacher_response import get_teacher_response
+from utils.custom_id import get_custom_ids
+from utils.get_teacher_response import get_teacher_response, create_system_prompt_cache, keep_system_prompt_cache_alive, delete_system_prompt_cache, create_teacher_batch_request, run_teacher_batch
+
+# Maximum number of requests to the teacher model that are in flight at the same time
+MAX_CONCURRENT_REQUESTS = 50
+
+# JSON schema of the expected response, generated once instead of by the SDK on every request
+RESUME_ANALYSIS_SCHEMA = ResumeAnalysis.model_json_schema()
+
+# Skeleton of the fallback analysis, validated once at import. Sub-models with nothing to extract hold empty values.
+_FALLBACK_RESUME = Resume.model_validate({
+    "summary": "Failed to extract",
+    "job_title": "Failed to extract",
+    "qualifications": {
+        "SKILLS": {"technical": [], "soft": [], "languages": [], "certifications": []},
+        "EDUCATION": {"degree": [], "level": [], "major": []},
+        "EXPERIENCE": {"years_in_total": 0, "years_in_current_company": 0, "current_employer": [], "position": [], "duration": []},
+        "OTHER_INFORMATION": {"awards_and_achievements": [], "publications": [], "projects": [], "volunteering": [], "leadership": []},
+        "CONTACT_INFORMATION": {"email": [], "phone": [], "address": [], "website": []},
+    },
+})
+
+_FALLBACK_JOB_DESCRIPTION = JobDescription.model_validate({
+    "job_title": "Failed to extract",
+    "location": [],
+    "job_type": "Failed to extract",
+    "work_type": "Failed to extract",
+    "EDUCATION": {"required_degree": [], "preferred_degree": [], "required_level": [], "preferred_level": [], "required_major": [], "preferred_major": []},
+    "EXPERIENCE": {"required_years_in_total": 0, "preferred_years_in_total": 0},
+    "SKILLS": {"required_technical": [], "preferred_technical": [], "required_soft": [], "preferred_soft": [], "required_languages": [], "preferred_languages": [], "required_certifications": [], "preferred_certifications": []},
+    "OTHER_INFORMATION": {"salary": "", "benefits": [], "bonus_qualifications": [], "relocation_assistance": False},
+})
+
+_FALLBACK_ANALYSIS = ResumeAnalysis(
+    summary="Failed to analyze resume - fallback summary created",
+    classification=ClassEnum.GOOD_FIT,
+    overall_score=50.0,
+    rationale="Model failed to generate analysis. This is a fallback response.",
+    suggestions="Please try again with a different model or check the resume and job description.",
+    matching_skills=["Failed to extract"],
+    missing_skills=["Failed to extract"],
+    resume=_FALLBACK_RESUME,
+    job_description=_FALLBACK_JOB_DESCRIPTION,
+)
 
 def create_fallback_analysis(resume_text: str, job_description_text: str, classification_label: str) -> ResumeAnalysis:
     """
     Creates a fallback ResumeAnalysis object when model response fails.
+    The prebuilt skeleton is copied and only the parts that depend on the row are replaced.
     
     Args:
         resume_text (str): The text of the resume.
@@ -33,53 +78,34 @@ def create_fallback_analysis(resume_text: str, job_description_text: str, classi
         class_enum = ClassEnum.NOT_FIT
     elif classification_label.lower() == "partial fit":
         class_enum = ClassEnum.PARTIAL_FIT
+
+    resume_snippet = resume_text[:500] + "..." if len(resume_text) > 500 else resume_text
+
+    return _FALLBACK_ANALYSIS.model_copy(update={
+        "classification": class_enum,
+        "resume": _FALLBACK_RESUME.model_copy(update={"summary": resume_snippet}),
+    })
     
-    return ResumeAnalysis(
-        summary=f"Failed to analyze resume - fallback summary created",
-        classification=class_enum,
-        overall_score=50.0,
-        rationale="Model failed to generate analysis. This is a fallback response.",
-        suggestions="Please try again with a different model or check the resume and job description.",
-        matching_skills=["Failed to extract"],
-        missing_skills=["Failed to extract"],
-        resume=Resume(
-            name="Failed to extract",
-            contact_information={},
-            education=[],
-            work_experience=[],
-            skills=[],
-            certifications=[],
-            full_text=resume_text[:500] + "..." if len(resume_text) > 500 else resume_text
-        ),
-        job_description=JobDescription(
-            title="Failed to extract",
-            company_name="Failed to extract",
-            location="Failed to extract",
-            required_skills=[],
-            preferred_skills=[],
-            responsibilities=[],
-            qualifications=[],
-            full_text=job_description_text[:500] + "..." if len(job_description_text) > 500 else job_description_text
-        )
-    )
-    
-def analyze_resume(model: str, resume_text: str, job_description_text: str, classification_label: str, response_format: ResumeAnalysis) -> ResumeAnalysis:
+async def analyze_resume(model: str, resume_text: str, job_description_text: str, classification_label: str, response_format: ResumeAnalysis, cached_content: Optional[str] = None, user_prompt: Optional[str] = None) -> ResumeAnalysis:
     """
-    Analyzes a resume against a job description and returns a ResumeAnalysis object.
+    Asynchronously analyzes a resume against a job description and returns a ResumeAnalysis object.
 
     Args:
         model (str): The model to be used for analysis.
         resume_text (str): The text of the resume.
         job_description_text (str): The text of the job description.
         classification_label (str): The classification label for the resume.
+        cached_content (Optional[str]): Name of the provider-side cache holding the system prompt, if any.
+        user_prompt (Optional[str]): The prebuilt user prompt; built from the texts and label if not given.
 
     Returns:
         ResumeAnalysis: An object containing the analysis results.
     """
-    user_prompt = get_distill_user_prompt(resume_text, job_description_text, classification_label)
+    if user_prompt is None:
+        user_prompt = get_distill_user_prompt(resume_text, job_description_text, classification_label)
 
     try:
-        response = get_teacher_response(model, SYSTEM_PROMPT, user_prompt, response_format)
+        response = await get_teacher_response(model, SYSTEM_PROMPT_SHORT, user_prompt, response_format, cached_content)
         
         # Check if response is None or an empty string
         if response is None or response == "":
@@ -92,60 +118,192 @@ def analyze_resume(model: str, resume_text: str, job_description_text: str, clas
         print(f"Error in analyze_resume: {e}")
         return create_fallback_analysis(resume_text, job_description_text, classification_label)
 
-def start_distillation(model:str, train_data: pd.DataFrame, response_format: ResumeAnalysis, results_file_path: Path, classes_file_path: Path) -> None:
+def to_jsonl_line(custom_id: str, analysis: ResumeAnalysis) -> bytes:
+    """
+    Serializes an analysis as one line of the results file, tagged with the custom_id of its training row.
+
+    Args:
+        custom_id (str): The identifier of the training row (see get_custom_id).
+        analysis (ResumeAnalysis): The analysis to serialize.
+
+    Returns:
+        bytes: The JSON line, including the trailing newline.
+    """
+    # Serialize straight to bytes in pydantic-core; model_dump_json() would decode to str only for us to encode it again.
+    # custom_id is a hex digest, so it can be spliced in front of the serialized fields without escaping
+    return b'{"custom_id":"' + custom_id.encode() + b'",' + analysis.__pydantic_serializer__.to_json(analysis)[1:] + b'\n'
+
+def load_processed_results(results_file_path: Path) -> Dict[str, str]:
+    """
+    Reads the results of a previous (possibly interrupted) run so that it can be resumed.
+    Anything after the last complete line, e.g. a line cut off by a crash, is removed from the file.
+
+    Args:
+        results_file_path (Path): Path to the results file.
+
+    Returns:
+        Dict[str, str]: The classification of every row already processed, keyed by custom_id, in file order.
+    """
+    processed: Dict[str, str] = {}
+    if not results_file_path.exists():
+        return processed
+
+    valid_size = 0
+    with open(results_file_path, 'rb') as results_file:
+        for line in results_file:
+            try:
+                if not line.endswith(b'\n'):
+                    raise ValueError("incomplete line")
+                result = json.loads(line)
+                processed[result['custom_id']] = result['classification']
+            except (ValueError, KeyError):
+                break
+            valid_size += len(line)
+
+    if valid_size < results_file_path.stat().st_size:
+        print(f"Warning: Discarding incomplete or unrecognized results after line {len(processed)} of {results_file_path}")
+        with open(results_file_path, 'r+b') as results_file:
+            results_file.truncate(valid_size)
+
+    return processed
+
+async def start_distillation(model:str, train_data: List[Dict[str, str]], response_format: ResumeAnalysis, results_file_path: Path, classes_file_path: Path, max_concurrent_requests: int = MAX_CONCURRENT_REQUESTS, overwrite: bool = False) -> None:
     """
     Starts the distillation process for the given model and training data.
-    Saves results incrementally as they are generated.
+    Requests to the teacher model are dispatched concurrently and each result is saved
+    as soon as it is generated, tagged with the custom_id of its row. The results (and the
+    classifications) are therefore in completion order, not row order.
+    Rows that already have a result in results_file_path are skipped, so an interrupted
+    run picks up where it left off.
 
     Args:
         model (str): The model to be used for distillation.
-        train_data (pd.DataFrame): The training data containing resumes and job descriptions.
-        response_format: The response format class.
+        train_data (List[Dict[str, str]]): The training rows, each with resume_text, job_description_text and label.
+        response_format: The response format class, or its precomputed JSON schema (see RESUME_ANALYSIS_SCHEMA).
         results_file_path (Path): Path where to save the results.
         classes_file_path (Path): Path where to save the classification results.
+        max_concurrent_requests (int): Maximum number of requests in flight at the same time.
+        overwrite (bool): Discard the results of a previous run instead of resuming it.
     """
     # Create results directory if it doesn't exist
     results_dir = results_file_path.parent
     if not results_dir.exists():
         results_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Open files for appending results incrementally
-    with open(results_file_path, 'w') as results_file:
-        predicted_labels = []
+
+    semaphore = asyncio.Semaphore(max_concurrent_requests)
+
+    async def analyze_row(slot: int, resume_text: str, job_description_text: str, classification_label: str):
+        try:
+            async with semaphore:
+                analysis = await analyze_resume(model, resume_text, job_description_text, classification_label, response_format, cached_content, user_prompts[slot])
+        except Exception as e:
+            print(f"Error processing item {remaining[slot]}: {e}")
+            analysis = None
+        return slot, analysis
+
+    # Pull the needed columns out once so the rest of the function works on plain lists
+    resumes, job_descriptions, labels = ([row[column] for row in train_data] for column in ('resume_text', 'job_description_text', 'label'))
+    custom_ids = get_custom_ids(resumes, job_descriptions)
+
+    processed = {} if overwrite else load_processed_results(results_file_path)
+    remaining = [position for position, custom_id in enumerate(custom_ids) if custom_id not in processed]
+    if processed:
+        print(f"Resuming: {len(processed)} items already processed, {len(remaining)} remaining")
+
+    # Build every prompt before dispatching so the event loop only sends requests and awaits responses
+    user_prompts = [get_distill_user_prompt(resumes[position], job_descriptions[position], labels[position]) for position in remaining]
+
+    # The system prompt is identical for every row, so register it with the provider once, and keep it alive for the whole run
+    cached_content = create_system_prompt_cache(model, SYSTEM_PROMPT_SHORT) if remaining else None
+    cache_keeper = asyncio.create_task(keep_system_prompt_cache_alive(cached_content)) if cached_content else None
+
+    # Dispatch rows from shortest to longest prompt so that each wave of concurrent requests takes a
+    # similar time and a few long prompts don't hold up the rest
+    lengths = [len(resumes[position]) + len(job_descriptions[position]) for position in remaining]
+    dispatch_order = sorted(range(len(lengths)), key=lengths.__getitem__)
+
+    try:
+        tasks = [
+            asyncio.create_task(analyze_row(slot, resumes[remaining[slot]], job_descriptions[remaining[slot]], labels[remaining[slot]]))
+            for slot in dispatch_order
+        ]
+
+        # Open files once and append results incrementally
+        with open(results_file_path, 'ab' if processed else 'wb') as results_file, open(classes_file_path, 'w') as classes_file:
+            predicted_labels = list(processed.values())
+            classes_file.write('predicted_labels\n')
+            classes_file.writelines(label + '\n' for label in predicted_labels)
         
-        for index, row in tqdm(train_data.iterrows(), total=train_data.shape[0], desc="Distilling Resumes"):
-            try:
-                resume_text = row['resume_text']
-                job_description_text = row['job_description_text']
-                classification_label = row['label']
-                
-                # Analyze resume
-                analysis = analyze_resume(model, resume_text, job_description_text, classification_label, response_format)
-                
-                # Save result immediately
+            for future in tqdm.as_completed(tasks, total=len(tasks), desc="Distilling Resumes"):
+                slot, analysis = await future
+
+                # Save result immediately; the custom_id ties it back to its row
                 if analysis is not None:
-                    json_line = json.dumps(analysis.model_dump())
-                    results_file.write(json_line + '\n')
-                    results_file.flush()  # Force write to disk
-                    
+                    results_file.write(to_jsonl_line(custom_ids[remaining[slot]], analysis))
+                
                     # Record classification
                     predicted_labels.append(analysis.classification.value)
-                    
-                    # Save classifications periodically (every 10 items)
+                    classes_file.write(analysis.classification.value + '\n')
+                
+                    # Checkpoint results and classifications periodically (every 10 items)
                     if len(predicted_labels) % 10 == 0:
-                        classifications = {"predicted_labels": predicted_labels}
-                        pd.DataFrame(classifications).to_csv(classes_file_path, index=False)
-                        print(f"Progress: {len(predicted_labels)}/{train_data.shape[0]} items processed")
-            
+                        results_file.flush()  # Force write to disk
+                        classes_file.flush()
+                        print(f"Progress: {len(predicted_labels)}/{len(train_data)} items processed")
+    finally:
+        # Stop paying for the cache even if the run fails or is interrupted
+        if cache_keeper:
+            cache_keeper.cancel()
+        if cached_content:
+            delete_system_prompt_cache(cached_content)
+
+    print(f"Distillation completed. Processed {len(predicted_labels)} out of {len(train_data)} items.")
+    print(f"Results saved to {results_file_path} and classifications saved to {classes_file_path}")
+
+def start_batch_distillation(model: str, train_data: List[Dict[str, str]], response_format: ResumeAnalysis, results_file_path: Path, classes_file_path: Path) -> None:
+    """
+    Runs the distillation through the provider's Batch API instead of interactive calls.
+    All prompts are written to a JSONL file and submitted as a single batch job; once the
+    job finishes, the results are written in the same layout as start_distillation.
+
+    Args:
+        model (str): The model to be used for distillation.
+        train_data (List[Dict[str, str]]): The training rows, each with resume_text, job_description_text and label.
+        response_format: The response format class.
+        results_file_path (Path): Path where to save the results.
+        classes_file_path (Path): Path where to save the classification results.
+    """
+    results_dir = results_file_path.parent
+    if not results_dir.exists():
+        results_dir.mkdir(parents=True, exist_ok=True)
+
+    resumes, job_descriptions, labels = ([row[column] for row in train_data] for column in ('resume_text', 'job_description_text', 'label'))
+    custom_ids = get_custom_ids(resumes, job_descriptions)
+
+    requests_file_path = results_dir / "distillation_batch_requests.jsonl"
+    with open(requests_file_path, 'w', encoding='utf-8') as requests_file:
+        for custom_id, resume_text, job_description_text, classification_label in zip(custom_ids, resumes, job_descriptions, labels):
+            user_prompt = get_distill_user_prompt(resume_text, job_description_text, classification_label)
+            request = create_teacher_batch_request(custom_id, SYSTEM_PROMPT_SHORT, user_prompt, RESUME_ANALYSIS_SCHEMA)
+            requests_file.write(json.dumps(request, ensure_ascii=False) + '\n')
+
+    print(f"Submitting {len(custom_ids)} requests from {requests_file_path} as a batch job")
+    responses = run_teacher_batch(model, requests_file_path)
+
+    with open(results_file_path, 'wb') as results_file, open(classes_file_path, 'w') as classes_file:
+        classes_file.write('predicted_labels\n')
+
+        for custom_id, resume_text, job_description_text, classification_label in zip(custom_ids, resumes, job_descriptions, labels):
+            try:
+                analysis = response_format.model_validate_json(responses[custom_id])
             except Exception as e:
-                print(f"Error processing item {index}: {e}")
-                # Continue with next item
-        
-        # Final save of classifications
-        classifications = {"predicted_labels": predicted_labels}
-        pd.DataFrame(classifications).to_csv(classes_file_path, index=False)
-        
-    print(f"Distillation completed. Processed {len(predicted_labels)} out of {train_data.shape[0]} items.")
+                print(f"Warning: No valid batch response for {custom_id} ({e}). Creating fallback ResumeAnalysis object.")
+                analysis = create_fallback_analysis(resume_text, job_description_text, classification_label)
+
+            results_file.write(to_jsonl_line(custom_id, analysis))
+            classes_file.write(analysis.classification.value + '\n')
+
+    print(f"Batch distillation completed. Processed {len(custom_ids)} items.")
     print(f"Results saved to {results_file_path} and classifications saved to {classes_file_path}")
 
 def main():
@@ -158,12 +316,14 @@ def main():
     
     parser.add_argument("-m", "--model", nargs='*', type=str, help="Model name.")
     parser.add_argument("-tr", "--train", nargs='*', type=str, help="Prompt style.")
+    parser.add_argument("-o", "--overwrite", action="store_true", help="Start from scratch instead of resuming from the rows already in the results file.")
+    parser.add_argument("-b", "--batch", action="store_true", help="Submit all requests as one job through the provider's Batch API (cheaper, but results arrive only when the job finishes).")
     
     args = parser.parse_args()
 
     MODEL: str 
     FILE_PATH: str
-    TRAIN_DATA: pd.DataFrame
+    TRAIN_DATA: List[Dict[str, str]]
       
     if args.model:
         MODEL = args.model
@@ -180,22 +340,34 @@ def main():
         print("Please specify the correct path using the -tr or --train parameter")
         return
 
-    TRAIN_DATA = pd.read_csv(TRAIN_FILE_PATH)
+    with open(TRAIN_FILE_PATH, 'r', encoding='utf-8-sig', newline='') as train_file:
+        TRAIN_DATA = list(csv.DictReader(train_file))
 
-    if TRAIN_DATA.empty:
+    if not TRAIN_DATA:
         print(f"Error: Data file '{TRAIN_FILE_PATH}' is empty.")
         return
 
     RESULTS_FILE_PATH = current_dir.parent.parent / "data/results/distillation" / "distillation_results.jsonl"
     CLASSES_FILE_PATH = current_dir.parent.parent / "data/results/distillation" / "distillation_classes.csv"
 
-    start_distillation(
+    if args.batch:
+        start_batch_distillation(
+            model=MODEL,
+            train_data=TRAIN_DATA,
+            response_format=ResumeAnalysis,
+            results_file_path=RESULTS_FILE_PATH,
+            classes_file_path=CLASSES_FILE_PATH
+        )
+        return
+
+    asyncio.run(start_distillation(
         model=MODEL, 
         train_data=TRAIN_DATA, 
-        response_format=ResumeAnalysis,
+        response_format=RESUME_ANALYSIS_SCHEMA,
         results_file_path=RESULTS_FILE_PATH,
-        classes_file_path=CLASSES_FILE_PATH
-    )
+        classes_file_path=CLASSES_FILE_PATH,
+        overwrite=args.overwrite
+    ))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
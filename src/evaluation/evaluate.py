@@ -1,53 +1,54 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, List
-import json
+from types import MappingProxyType
+from typing import Dict, Any, List, Tuple
 import math
-import statistics
+import os
+import numpy as np
+import orjson
 
-def load_annotator_rankings(annotations_file_path: str) -> Dict[str, List[List[int]]]:
+def _to_rankings_array(rankings: List[List[int]]) -> np.ndarray | List[np.ndarray]:
     """
-    Load annotator rankings from a JSON file in the format {ranklist_i: [[rankings], ...]}.
+    Convert the rankings of one ranklist to a 2-D int32 array, or to one int32 array per row if the rows differ in length.
 
     Args:
-        annotations_file_path (str): Path to the annotations JSON file.
+        rankings (List[List[int]]): The ranked job indices, one list per resume.
 
     Returns:
-        Dict[str, List[List[int]]]: Dictionary mapping ranklist IDs to lists of ranked job indices.
+        np.ndarray | List[np.ndarray]: The rankings as a (resumes, jobs) array, or a list of 1-D arrays for ragged rankings.
     """
-    if not Path(annotations_file_path).exists():
-        print(f"Error: {annotations_file_path} does not exist.")
-        return {}
-            
-    with open(annotations_file_path, 'r') as f:
-        data = json.load(f)
-        # Ensure only ranklist_i keys are included
-        rankings = {k: v for k, v in data.items() if k.startswith("ranklist_")}
-        return rankings
-
-def get_scores(file_path: Path) -> Dict[str, List[float]]:
+    if len({len(ranking) for ranking in rankings}) <= 1:
+        return np.asarray(rankings, dtype=np.int32)
+    return [np.asarray(ranking, dtype=np.int32) for ranking in rankings]
+
+def load_annotator_rankings(annotations_file_path: str) -> Dict[str, np.ndarray | List[np.ndarray]]:
     """
-    Get scores from a JSON file.
+    Load annotator rankings from a JSON file in the format {ranklist_i: [[rankings], ...]}.
 
     Args:
-        file_path (Path): Path to the JSON file.
+        annotations_file_path (str): Path to the annotations JSON file.
 
     Returns:
-        Dict[str, List[float]]: Dictionary containing the scores.
+        Dict[str, np.ndarray | List[np.ndarray]]: Dictionary mapping ranklist IDs to int32 arrays of ranked job indices,
+        one row per resume (a list of per-row arrays when the rankings differ in length).
     """
-    scores: Dict[str, List[float]] = {}
-    with open(file_path, 'r') as f:
-        for idx, line in enumerate(f, 1):
-            key = f"Resume_{idx}"
-            line = json.loads(line)
-            scores[key] = [item['overall_score'] for item in line[key]]
-    return scores
+    if not Path(annotations_file_path).exists():
+        print(f"Error: {annotations_file_path} does not exist.")
+        return {}
 
-def degree_to_numeric(degree):
-    """Convert degree level to numeric value, handling variations in naming."""
+    data = orjson.loads(Path(annotations_file_path).read_bytes())
+    # Ensure only ranklist_i keys are included
+    return {k: _to_rankings_array(data[k]) for k in data if k.startswith("ranklist_")}
+
+@lru_cache(maxsize=256)
+def degree_to_numeric(degree: str) -> int:
+    """Convert degree level to numeric value, handling variations in naming.
+    The vocabulary of degree names is small, so results are memoized per string."""
     # Normalize the degree string
     try:
-        degree = degree[0].lower().replace("'", "")  # Remove apostrophes (e.g., Master's → Masters)
-        degree = degree[0].replace(".", "")  # Remove periods (e.g., Ph.D → PhD)
+        degree = degree.lower().replace("'", "")  # Remove apostrophes (e.g., Master's → Masters)
+        degree = degree.replace(".", "")  # Remove periods (e.g., Ph.D → PhD)
         # Handle plural forms by removing 's' if it's at the end
         if degree.endswith("s"):
             degree = degree[:-1]
@@ -88,7 +89,13 @@ def degree_sim(c_degree, r_degree):
         c_degree = c_degree[0] if c_degree else ""
     if isinstance(r_degree, list) and len(r_degree) > 0:
         r_degree = r_degree[0] if r_degree else ""
-    
+
+    return _degree_sim_str(c_degree, r_degree)
+
+@lru_cache(maxsize=1024)
+def _degree_sim_str(c_degree: str, r_degree: str) -> float:
+    """DegreeSim of a single candidate/required degree pair.
+    The same pairs recur across resumes, so results are memoized."""
     try:
         cand_level = degree_to_numeric(c_degree)
         req_level = degree_to_numeric(r_degree)
@@ -103,6 +110,17 @@ def degree_sim(c_degree, r_degree):
         print(f"Error in degree_sim: {e}")
         return 0
 
+RELATED_MAJORS = {
+    "Computer Science": ["Computer Science", "Information Technology", "Cyber Security", "Data Engineering", "Data Science", "Artificial Intelligence", "Machine Learning", "Deep Learning", "Computer Engineering", "Software Engineering"],
+    "Statistics": ["Statistics", "Mathematics", "Data Science", "Data Analysis", "Business Analytics", "Business Intelligence", "Finance", "Economics", "Marketing", "Operations Research", "Supply Chain Management"],
+    "Decision Science": ["Decision Science", "Mathematics", "Statistics", "Data Science", "Data Analysis", "Business Analytics", "Business Intelligence", "Finance", "Economics", "Marketing", "Operations Research", "Supply Chain Management"],
+    "Mathematics": ["Data Science", "Physics", "Applied Mathematics", "Statistics"],
+    "Electrical Engineering": ["Electrical Engineering", "Electronics", "Computer Engineering", "VLSI Engineering", "Communication Engineering", "Electronics and Communication Engineering", "Electronics and Computer Engineering", "Electronics and Electrical Engineering"],
+}
+
+# Lowercased once at import so majors_sim can compare normalized majors with a set lookup
+_RELATED_MAJORS_LOWER = {k.lower(): frozenset(m.lower() for m in v) for k, v in RELATED_MAJORS.items()}
+
 def majors_sim(r_major, j_major):
     """Compute MajorsSim(r,j) based on major similarity.
     
@@ -123,15 +141,13 @@ def majors_sim(r_major, j_major):
 
     if isinstance(r_major, list) and len(r_major) > 0:
         r_major = r_major[0] if r_major else ""
-    
-    related_majors = {
-        "Computer Science": ["Computer Science", "Information Technology", "Cyber Security", "Data Engineering", "Data Science", "Artificial Intelligence", "Machine Learning", "Deep Learning", "Computer Engineering", "Software Engineering"],
-        "Statistics": ["Statistics", "Mathematics", "Data Science", "Data Analysis", "Business Analytics", "Business Intelligence", "Finance", "Economics", "Marketing", "Operations Research", "Supply Chain Management"],
-        "Decision Science": ["Decision Science", "Mathematics", "Statistics", "Data Science", "Data Analysis", "Business Analytics", "Business Intelligence", "Finance", "Economics", "Marketing", "Operations Research", "Supply Chain Management"],
-        "Mathematics": ["Data Science", "Physics", "Applied Mathematics", "Statistics"],
-        "Electrical Engineering": ["Electrical Engineering", "Electronics", "Computer Engineering", "VLSI Engineering", "Communication Engineering", "Electronics and Communication Engineering", "Electronics and Computer Engineering", "Electronics and Electrical Engineering"],
-    }
-    
+
+    return _majors_sim_str(r_major, j_major)
+
+@lru_cache(maxsize=1024)
+def _majors_sim_str(r_major: str, j_major: str) -> float:
+    """MajorsSim of a single candidate/required major pair.
+    The same pairs recur across resumes, so results are memoized."""
     try:
         r_major = r_major.lower()
         j_major = j_major.lower()
@@ -140,38 +156,52 @@ def majors_sim(r_major, j_major):
     
     if r_major == j_major:
         return 1
-    related_set = related_majors.get(j_major, [])
-    if r_major in [m.lower() for m in related_set]:
+    if r_major in _RELATED_MAJORS_LOWER.get(j_major, ()):
         return 0.5
     return 0
 
-def get_cdegree_rdegree(filepath: Path) -> Dict[str, Dict[str, List[Dict[str, List[str]]]]]:
+# Shared, read-only default for missing sections, so lookups don't allocate a new empty dict each time
+_EMPTY_DICT = MappingProxyType({})
+
+def load_inference(file_path: Path) -> Tuple[Dict[str, List[float]], Dict[str, Dict[str, List[Dict[str, List[str]]]]]]:
+    """
+    Load the scores and the education data of every resume from the inference results in a single pass over the file.
+
+    Args:
+        file_path (Path): Path to the inference results (JSONL).
+
+    Returns:
+        Tuple[Dict[str, List[float]], Dict[str, Dict[str, List[Dict[str, List[str]]]]]]: The overall scores of each resume,
+        and the candidate's and the jobs' education for each resume, both keyed by resume ID.
+    """
+    scores: Dict[str, List[float]] = {}
     cdegree_rdegree_dict: Dict[str, Dict[str, List[Dict[str, List[str]]]]] = {}
-    with open(filepath, 'r') as f:
+    with open(file_path, 'rb') as f:
         for idx, line in enumerate(f, 1):
             key = f"Resume_{idx}"
-            line = json.loads(line)
-            c_edu = [
-                {
-                    "degree": item.get('resume', {}).get('qualifications', {}).get('EDUCATION', {}).get("degree", []),
-                    "level": item.get('resume', {}).get('qualifications', {}).get('EDUCATION', {}).get("level", []),
-                    "major": item.get('resume', {}).get('qualifications', {}).get('EDUCATION', {}).get("major", [])
-                }
-                for item in line[key]
-            ]
-            r_edu = [
-                {
-                    "required_degree": item.get('job_description', {}).get('EDUCATION', {}).get("required_degree", []),
-                    "preferred_degree": item.get('job_description', {}).get('EDUCATION', {}).get("preferred_degree", []),
-                    "required_level": item.get('job_description', {}).get('EDUCATION', {}).get("required_level", []),
-                    "preferred_level": item.get('job_description', {}).get('EDUCATION', {}).get("preferred_level", []),
-                    "required_major": item.get('job_description', {}).get('EDUCATION', {}).get("required_major", []),
-                    "preferred_major": item.get('job_description', {}).get('EDUCATION', {}).get("preferred_major", [])
-                }
-                for item in line[key]
-            ]
+            items = orjson.loads(line)[key]
+            scores[key] = [item['overall_score'] for item in items]
+            c_edu = []
+            r_edu = []
+            for item in items:
+                # Look up each EDUCATION section once instead of walking the chain again for every field
+                resume_edu = item.get('resume', _EMPTY_DICT).get('qualifications', _EMPTY_DICT).get('EDUCATION', _EMPTY_DICT)
+                job_edu = item.get('job_description', _EMPTY_DICT).get('EDUCATION', _EMPTY_DICT)
+                c_edu.append({
+                    "degree": resume_edu.get("degree", []),
+                    "level": resume_edu.get("level", []),
+                    "major": resume_edu.get("major", [])
+                })
+                r_edu.append({
+                    "required_degree": job_edu.get("required_degree", []),
+                    "preferred_degree": job_edu.get("preferred_degree", []),
+                    "required_level": job_edu.get("required_level", []),
+                    "preferred_level": job_edu.get("preferred_level", []),
+                    "required_major": job_edu.get("required_major", []),
+                    "preferred_major": job_edu.get("preferred_major", [])
+                })
             cdegree_rdegree_dict[key] = {"resume_education": c_edu, "job_education": r_edu}
-    return cdegree_rdegree_dict
+    return scores, cdegree_rdegree_dict
 
 def compute_adjusted_scores(scores: List[float], resume_education: List[Dict[str, List[str]]], job_education: List[Dict[str, List[str]]]) -> List[float]:
     """
@@ -187,97 +217,120 @@ def compute_adjusted_scores(scores: List[float], resume_education: List[Dict[str
     Returns:
         List[float]: Adjusted scores for each job.
     """
-    from collections import defaultdict
+    scores_array = np.asarray(scores, dtype=np.float64)
 
     # Step 1: Identify duplicate scores and find caps
-    score_groups = defaultdict(list)
-    for idx, score in enumerate(scores):
-        score_groups[score].append(idx)
-    
-    # Get sorted unique scores to determine caps
-    unique_scores = sorted(set(scores))
-    
-    # Map each score to the next highest score (cap)
-    score_caps = {}
-    for i, score in enumerate(unique_scores):
-        if i + 1 < len(unique_scores):
-            score_caps[score] = unique_scores[i + 1]
-        else:
-            score_caps[score] = float('inf')  # No cap for the highest score
+    # Sorted unique scores, the group of each score, and the size of each group
+    unique_scores, groups, counts = np.unique(scores_array, return_inverse=True, return_counts=True)
     
     # Step 2: Compute adjusted scores with caps
-    adjusted_scores = scores.copy()
+    adjusted_scores = scores_array.copy()
     rank_factor = 0.01  # Small factor to ensure uniqueness within adjustments
     
-    for score, indices in score_groups.items():
-        if len(indices) > 1:  # Only adjust if there are duplicates
-            # Compute DegreeSim and MajorsSim for each job
-            adjustments = []
-            for idx in indices:
-                degree_score = degree_sim(resume_education[idx]["level"], job_education[idx]["required_degree"])
-                majors_score = majors_sim(resume_education[idx]["major"], job_education[idx]["required_major"])
-                total_adjustment = degree_score + majors_score
-                adjustments.append((idx, total_adjustment))
-            
-            # Sort by adjustment (descending) to prioritize better matches
-            adjustments.sort(key=lambda x: x[1], reverse=True)
-            
-            # Determine the cap for this score
-            cap = score_caps[score]
-            
-            # Apply adjustments, ensuring they don't exceed the cap
-            for rank, (idx, adjustment) in enumerate(adjustments):
-                # Base adjustment plus rank factor for uniqueness
-                adjusted = score + adjustment * 0.01 + (len(indices) - rank - 1) * rank_factor
-                # Cap the adjusted score to be less than the next highest score
-                if cap != float('inf'):
-                    adjusted = min(adjusted, cap - rank_factor)
-                adjusted_scores[idx] = adjusted
+    for group in np.flatnonzero(counts > 1):  # Only adjust if there are duplicates
+        indices = np.flatnonzero(groups == group)
+        score = unique_scores[group]
+        # unique_scores is sorted, so the cap (the next highest score) is the next entry; there is no cap for the highest score
+        cap = unique_scores[group + 1] if group + 1 < len(unique_scores) else np.inf
+
+        # Compute DegreeSim and MajorsSim for each job
+        adjustments = np.array([
+            degree_sim(resume_education[idx]["level"], job_education[idx]["required_degree"])
+            + majors_sim(resume_education[idx]["major"], job_education[idx]["required_major"])
+            for idx in indices
+        ], dtype=np.float64)
+
+        # Sort by adjustment (descending) to prioritize better matches; ties keep their original order
+        order = np.argsort(-adjustments, kind="stable")
+        ranks = np.arange(len(indices))
+
+        # Base adjustment plus rank factor for uniqueness
+        adjusted = score + adjustments[order] * 0.01 + (len(indices) - ranks - 1) * rank_factor
+        # Cap the adjusted score to be less than the next highest score
+        adjusted_scores[indices[order]] = np.minimum(adjusted, cap - rank_factor)
     
-    return adjusted_scores
+    return adjusted_scores.tolist()
+
+def _count_inversions(values: List[int]) -> Tuple[List[int], int]:
+    """
+    Sort values with a merge sort, counting the pairs that are out of order along the way.
 
-def compute_kendall_tau(model_ranking: List[int], annotator_ranking: List[int]) -> float:
+    Args:
+        values (List[int]): The values to sort.
+
+    Returns:
+        Tuple[List[int], int]: The sorted values and the number of pairs (i < j) with values[i] > values[j].
+    """
+    if len(values) < 2:
+        return values, 0
+
+    middle = len(values) // 2
+    left, left_inversions = _count_inversions(values[:middle])
+    right, right_inversions = _count_inversions(values[middle:])
+
+    merged: List[int] = []
+    inversions = left_inversions + right_inversions
+    i = j = 0
+    while i < len(left) and j < len(right):
+        if left[i] <= right[j]:
+            merged.append(left[i])
+            i += 1
+        else:
+            # right[j] is smaller than every value left in left[i:]
+            merged.append(right[j])
+            inversions += len(left) - i
+            j += 1
+    merged.extend(left[i:])
+    merged.extend(right[j:])
+    return merged, inversions
+
+def _count_tied_pairs(values: np.ndarray) -> int:
+    """
+    Count the pairs of equal values (or equal rows, for a 2-D array).
+
+    Args:
+        values (np.ndarray): The values to check for ties.
+
+    Returns:
+        int: The number of tied pairs.
+    """
+    counts = np.unique(values, axis=0, return_counts=True)[1]
+    return int((counts * (counts - 1) // 2).sum())
+
+def compute_kendall_tau(model_ranking: List[int] | np.ndarray, annotator_ranking: List[int] | np.ndarray) -> float:
     """
     Compute Kendall's Tau-b correlation coefficient between two ranked lists.
+    Uses Knight's O(n log n) algorithm: after sorting the pairs by the model ranking, the discordant
+    pairs are the inversions left in the annotator ranking, which a merge sort counts.
 
     Args:
-        model_ranking (List[int]): Model's ranked job indices (1-based).
-        annotator_ranking (List[int]): Annotator's ranked job indices (1-based).
+        model_ranking (List[int] | np.ndarray): Model's ranked job indices (1-based).
+        annotator_ranking (List[int] | np.ndarray): Annotator's ranked job indices (1-based).
 
     Returns:
         float: Kendall's Tau-b coefficient (-1 to 1), or 0.0 for invalid inputs.
     """
-    if not model_ranking or not annotator_ranking or len(model_ranking) != len(annotator_ranking):
+    if len(model_ranking) == 0 or len(annotator_ranking) == 0 or len(model_ranking) != len(annotator_ranking):
         print("Error: Invalid or mismatched ranking lists.")
         return 0.0
 
+    model_ranking = np.asarray(model_ranking, dtype=np.int32)
+    annotator_ranking = np.asarray(annotator_ranking, dtype=np.int32)
+
     n = len(model_ranking)
-    concordant = 0
-    discordant = 0
-    model_ties = 0
-    annotator_ties = 0
-
-    # Compare all pairs
-    for i in range(n):
-        for j in range(i + 1, n):
-            model_diff = model_ranking[i] - model_ranking[j]
-            annotator_diff = annotator_ranking[i] - annotator_ranking[j]
-            
-            # Concordant: same relative order
-            if model_diff * annotator_diff > 0:
-                concordant += 1
-            # Discordant: opposite relative order
-            elif model_diff * annotator_diff < 0:
-                discordant += 1
-            # Ties: count ties in each ranking
-            else:
-                if model_diff == 0:
-                    model_ties += 1
-                if annotator_diff == 0:
-                    annotator_ties += 1
+    # Sort by the model ranking, breaking ties by the annotator ranking so tied pairs are not counted as inversions
+    order = np.lexsort((annotator_ranking, model_ranking))
+    _, discordant = _count_inversions(annotator_ranking[order].tolist())
+
+    # Ties: count ties in each ranking, and pairs tied in both
+    model_ties = _count_tied_pairs(model_ranking)
+    annotator_ties = _count_tied_pairs(annotator_ranking)
+    joint_ties = _count_tied_pairs(np.column_stack((model_ranking, annotator_ranking)))
 
     # Total pairs
     total_pairs = n * (n - 1) / 2
+    # Every pair that is not tied in either ranking is concordant or discordant
+    concordant = total_pairs - model_ties - annotator_ties + joint_ties - discordant
     # Adjust for ties
     denominator = math.sqrt((total_pairs - model_ties) * (total_pairs - annotator_ties))
     
@@ -288,87 +341,137 @@ def compute_kendall_tau(model_ranking: List[int], annotator_ranking: List[int])
     tau = (concordant - discordant) / denominator
     return tau
 
-curr_dir = Path(__file__).parent
-parent_dir = curr_dir.parent.parent
-INFERENCE_FILE_PATH = parent_dir / "data" / "results" / "inference" / "inference.jsonl"
-ANNOTATIONS_FILE_PATH = parent_dir / "data" / "test" / "annotations.json"
-scores_list = get_scores(INFERENCE_FILE_PATH)
-cdegree_rdegree_dict = get_cdegree_rdegree(INFERENCE_FILE_PATH)
-annotator_rankings = load_annotator_rankings(ANNOTATIONS_FILE_PATH)
-
-adjusted_scores: Dict[str, List[float]] = {}
-ranked_indices: Dict[str, List[int]] = {}
-alignment_scores: Dict[str, Dict[str, float]] = {}
-print(scores_list)
-print("==========================================================")
-# Limit to first 10 resumes
-for idx, (k, v) in enumerate(list(scores_list.items())[:10], 1):
-    # Get education data for all jobs of this resume
-    resume_edu = cdegree_rdegree_dict[k]['resume_education']
-    job_edu = cdegree_rdegree_dict[k]['job_education']
+def compute_kendall_tau_batch(model_rankings: List[List[int]] | np.ndarray, annotator_rankings: List[List[int]] | np.ndarray) -> np.ndarray:
+    """
+    Compute Kendall's Tau-b for many pairs of ranked lists, pairing the i-th model ranking with the i-th annotator ranking.
+    Each pair goes through compute_kendall_tau, so every comparison is O(n log n) and mismatched pairs score 0.0.
+
+    Args:
+        model_rankings (List[List[int]] | np.ndarray): Model's ranked job indices (1-based), one ranking per row.
+        annotator_rankings (List[List[int]] | np.ndarray): Annotator's ranked job indices (1-based), one ranking per row.
+
+    Returns:
+        np.ndarray: Kendall's Tau-b coefficient of each pair of rankings, 0.0 where it is undefined.
+    """
+    return np.fromiter(
+        (compute_kendall_tau(model_ranking, annotator_ranking) for model_ranking, annotator_ranking in zip(model_rankings, annotator_rankings)),
+        dtype=np.float64,
+    )
+
+def process_one(k: str, scores: List[float], resume_edu: List[Dict[str, List[str]]], job_edu: List[Dict[str, List[str]]]) -> Tuple[str, List[float], List[int]]:
+    """
+    Compute the adjusted scores of one resume's jobs and rank the jobs by them.
+
+    Args:
+        k (str): The resume ID.
+        scores (List[float]): The overall score of the resume for each job.
+        resume_edu (List[Dict[str, List[str]]]): Candidate's education for each job.
+        job_edu (List[Dict[str, List[str]]]): Job education requirements for each job.
+
+    Returns:
+        Tuple[str, List[float], List[int]]: The resume ID, the adjusted scores, and the 1-based job indices from best to worst.
+    """
     # Compute adjusted scores for all jobs
-    adjusted_scores[k] = compute_adjusted_scores(v, resume_edu, job_edu)
+    adjusted = compute_adjusted_scores(scores, resume_edu, job_edu)
     # Rank adjusted scores in descending order and get 1-based indices
-    indexed_scores = [(score, idx) for idx, score in enumerate(adjusted_scores[k])]
+    indexed_scores = [(score, idx) for idx, score in enumerate(adjusted)]
     indexed_scores.sort(key=lambda x: (-x[0], x[1]))  # Sort by score (descending), then index (ascending)
-    ranked_indices[k] = [idx + 1 for _, idx in indexed_scores]  # Convert to 1-based indices
-    # Compute alignment with annotator rankings for each ranklist (first 10 resumes)
-    alignment_scores[k] = {}
-    for ranklist_id, rankings in annotator_rankings.items():
-        if idx - 1 < len(rankings[:10]):  # Limit to first 10 rankings
-            annotator_ranking = rankings[idx - 1]
-            alignment_scores[k][ranklist_id] = compute_kendall_tau(ranked_indices[k], annotator_ranking)
-        else:
+    ranked = [idx + 1 for _, idx in indexed_scores]  # Convert to 1-based indices
+    return k, adjusted, ranked
+
+def main():
+    curr_dir = Path(__file__).parent
+    parent_dir = curr_dir.parent.parent
+    INFERENCE_FILE_PATH = parent_dir / "data" / "results" / "inference" / "inference.jsonl"
+    ANNOTATIONS_FILE_PATH = parent_dir / "data" / "test" / "annotations.json"
+    scores_list, cdegree_rdegree_dict = load_inference(INFERENCE_FILE_PATH)
+    annotator_rankings = load_annotator_rankings(ANNOTATIONS_FILE_PATH)
+    # First 10 rankings of each ranklist; every comparison below works on views of these arrays
+    annotator_arrays = {ranklist_id: rankings[:10] for ranklist_id, rankings in annotator_rankings.items()}
+
+    adjusted_scores: Dict[str, List[float]] = {}
+    ranked_indices: Dict[str, List[int]] = {}
+    alignment_scores: Dict[str, Dict[str, float]] = {}
+    print(scores_list)
+    print("==========================================================")
+    # Limit to first 10 resumes; each resume is independent, so they are processed in parallel
+    resume_ids = list(scores_list)[:10]
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        results = executor.map(
+            process_one,
+            resume_ids,
+            [scores_list[k] for k in resume_ids],
+            [cdegree_rdegree_dict[k]['resume_education'] for k in resume_ids],
+            [cdegree_rdegree_dict[k]['job_education'] for k in resume_ids],
+        )
+        for k, adjusted, ranked in results:
+            adjusted_scores[k] = adjusted
+            ranked_indices[k] = ranked
+            alignment_scores[k] = {}
+
+    # Compute alignment with annotator rankings for each ranklist (first 10 resumes), all resumes in one call per ranklist
+    model_rankings = [ranked_indices[k] for k in resume_ids]
+    for ranklist_id, rankings in annotator_arrays.items():
+        available = min(len(resume_ids), len(rankings))
+        if available:
+            taus = compute_kendall_tau_batch(model_rankings[:available], rankings[:available])
+            for k, tau in zip(resume_ids, taus.tolist()):
+                alignment_scores[k][ranklist_id] = tau
+        for k in resume_ids[available:]:
             print(f"Warning: No annotator ranking found for {k} in {ranklist_id}")
             alignment_scores[k][ranklist_id] = 0.0
 
-# Compute overall performance metrics
-per_resume_mean_tau = {}
-per_ranklist_mean_tau = {ranklist_id: [] for ranklist_id in annotator_rankings}
-inter_annotator_tau = []
-all_tau_values = []
-
-# Calculate per-resume mean Tau and collect Tau values
-for k in alignment_scores:
-    tau_values = [tau for tau in alignment_scores[k].values() if tau != 0.0]  # Exclude missing rankings
-    if tau_values:
-        per_resume_mean_tau[k] = statistics.mean(tau_values)
-        all_tau_values.extend(tau_values)
-    else:
-        per_resume_mean_tau[k] = 0.0
-    # Collect Tau for per-ranklist means
-    for ranklist_id in per_ranklist_mean_tau:
-        if ranklist_id in alignment_scores[k] and alignment_scores[k][ranklist_id] != 0.0:
-            per_ranklist_mean_tau[ranklist_id].append(alignment_scores[k][ranklist_id])
-
-# Compute inter-annotator agreement (Tau between ranklist_1 and ranklist_2)
-if "ranklist_1" in annotator_rankings and "ranklist_2" in annotator_rankings:
-    for idx in range(min(10, len(annotator_rankings["ranklist_1"]), len(annotator_rankings["ranklist_2"]))):
-        tau = compute_kendall_tau(annotator_rankings["ranklist_1"][idx], annotator_rankings["ranklist_2"][idx])
-        if tau != 0.0:  # Exclude invalid comparisons
-            inter_annotator_tau.append(tau)
-
-# Compute overall metrics
-overall_mean_tau = statistics.mean(all_tau_values) if all_tau_values else 0.0
-overall_std_tau = statistics.stdev(all_tau_values) if len(all_tau_values) > 1 else 0.0
-per_ranklist_means = {
-    ranklist_id: statistics.mean(taus) if taus else 0.0
-    for ranklist_id, taus in per_ranklist_mean_tau.items()
-}
-inter_annotator_mean_tau = statistics.mean(inter_annotator_tau) if inter_annotator_tau else 0.0
-
-# Print results
-print("Adjusted Scores:", adjusted_scores)
-print("Ranked Indices:", ranked_indices)
-print("Alignment Scores (Kendall's Tau):", alignment_scores)
-print("==========================================================")
-print("Performance Metrics:")
-print(f"Overall Mean Kendall's Tau: {overall_mean_tau:.3f}")
-print(f"Overall Standard Deviation of Tau: {overall_std_tau:.3f}")
-print("Per-Resume Mean Kendall's Tau:")
-for k, mean_tau in per_resume_mean_tau.items():
-    print(f"  {k}: {mean_tau:.3f}")
-print("Per-Ranklist Mean Kendall's Tau:")
-for ranklist_id, mean_tau in per_ranklist_means.items():
-    print(f"  {ranklist_id}: {mean_tau:.3f}")
-print(f"Inter-Annotator Mean Kendall's Tau: {inter_annotator_mean_tau:.3f}")
\ No newline at end of file
+    # Compute overall performance metrics
+    per_resume_mean_tau = {}
+    per_ranklist_mean_tau = {ranklist_id: [] for ranklist_id in annotator_rankings}
+    inter_annotator_tau = []
+    all_tau_values = []
+
+    # Calculate per-resume mean Tau and collect Tau values
+    for k in alignment_scores:
+        tau_values = [tau for tau in alignment_scores[k].values() if tau != 0.0]  # Exclude missing rankings
+        if tau_values:
+            per_resume_mean_tau[k] = float(np.mean(tau_values))
+            all_tau_values.extend(tau_values)
+        else:
+            per_resume_mean_tau[k] = 0.0
+        # Collect Tau for per-ranklist means
+        for ranklist_id in per_ranklist_mean_tau:
+            if ranklist_id in alignment_scores[k] and alignment_scores[k][ranklist_id] != 0.0:
+                per_ranklist_mean_tau[ranklist_id].append(alignment_scores[k][ranklist_id])
+
+    # Compute inter-annotator agreement (Tau between ranklist_1 and ranklist_2)
+    if "ranklist_1" in annotator_arrays and "ranklist_2" in annotator_arrays:
+        common = min(len(annotator_arrays["ranklist_1"]), len(annotator_arrays["ranklist_2"]))
+        if common:
+            taus = compute_kendall_tau_batch(annotator_arrays["ranklist_1"][:common], annotator_arrays["ranklist_2"][:common])
+            inter_annotator_tau = [tau for tau in taus.tolist() if tau != 0.0]  # Exclude invalid comparisons
+
+    # Compute overall metrics
+    all_tau_array = np.asarray(all_tau_values, dtype=np.float64)
+    overall_mean_tau = float(all_tau_array.mean()) if all_tau_array.size else 0.0
+    overall_std_tau = float(all_tau_array.std(ddof=1)) if all_tau_array.size > 1 else 0.0  # Sample standard deviation
+    per_ranklist_means = {
+        ranklist_id: float(np.mean(taus)) if taus else 0.0
+        for ranklist_id, taus in per_ranklist_mean_tau.items()
+    }
+    inter_annotator_mean_tau = float(np.mean(inter_annotator_tau)) if inter_annotator_tau else 0.0
+
+    # Print results
+    print("Adjusted Scores:", adjusted_scores)
+    print("Ranked Indices:", ranked_indices)
+    print("Alignment Scores (Kendall's Tau):", alignment_scores)
+    print("==========================================================")
+    print("Performance Metrics:")
+    print(f"Overall Mean Kendall's Tau: {overall_mean_tau:.3f}")
+    print(f"Overall Standard Deviation of Tau: {overall_std_tau:.3f}")
+    print("Per-Resume Mean Kendall's Tau:")
+    for k, mean_tau in per_resume_mean_tau.items():
+        print(f"  {k}: {mean_tau:.3f}")
+    print("Per-Ranklist Mean Kendall's Tau:")
+    for ranklist_id, mean_tau in per_ranklist_means.items():
+        print(f"  {ranklist_id}: {mean_tau:.3f}")
+    print(f"Inter-Annotator Mean Kendall's Tau: {inter_annotator_mean_tau:.3f}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -2,7 +2,6 @@ import os
 from together import Together
 from typing import Any
 import argparse
-import subprocess
 import time
 
 try:
@@ -17,6 +16,30 @@ except Exception as e:
     print(f"Error: {e}")
     exit()
 
+# Bounds (in seconds) of the wait between two checks of the fine-tuning job's events
+MIN_POLL_INTERVAL = 5
+MAX_POLL_INTERVAL = 60
+
+class AdaptivePoller:
+    """
+    Wait between polls that starts short and doubles after every poll that brings nothing new,
+    so that updates are picked up quickly while the job is active without polling a quiet job constantly.
+    """
+    def __init__(self, min_interval: float = MIN_POLL_INTERVAL, max_interval: float = MAX_POLL_INTERVAL):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+
+    def wait(self, got_update: bool) -> None:
+        """
+        Sleeps before the next poll.
+
+        Args:
+            got_update (bool): Whether the last poll returned anything new; resets the wait to the minimum.
+        """
+        self.interval = self.min_interval if got_update else min(self.interval * 2, self.max_interval)
+        time.sleep(self.interval)
+
 def create_finetune_job(model_name: str, train_file_id: str, val_file_id: str, suffix: Any):
     suffix: str
     client = Together(api_key = TOGETHER_API_KEY)
@@ -86,13 +109,21 @@ def main():
 
     ft_id = finetune_response.id
 
+    # Poll the job's events in-process instead of starting the together CLI on every check
+    client = Together(api_key = TOGETHER_API_KEY)
+    poller = AdaptivePoller()
+    seen_events = 0
+
     while True:
-        process = subprocess.Popen(['together', 'fine-tuning', 'list-events', ft_id], stdout=subprocess.PIPE, text=True)
-        output, _ = process.communicate()
-        print(output)
-        if "Job finished" in output:
+        events = client.fine_tuning.list_events(id=ft_id).data
+        # Events are returned oldest first, so only print the ones that arrived since the last check
+        new_events = events[seen_events:]
+        for event in new_events:
+            print(f"{event.created_at} {event.message}")
+        seen_events = len(events)
+        if any("Job finished" in (event.message or "") for event in new_events):
             break
-        time.sleep(60)
+        poller.wait(got_update=bool(new_events))
 
     print(f"Fine-tuning job completed successfully.\n visit https://api.together.ai/fine-tuning to download the checkpoints or deploy a dedicated endpoint for inference.")
 
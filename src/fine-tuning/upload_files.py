@@ -1,6 +1,8 @@
 import os
 import argparse
 import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
 from together import Together
 from together.utils import check_file
 
@@ -10,35 +12,42 @@ except Exception as e:
     print(f"Error: {e}")
     exit()
 
-def check_and_upload_files(filepath:str):
+def check_and_upload_files(filepaths: List[str]):
     """
     Check the file format and upload the training data to Together.
+    The files are checked concurrently and then uploaded through a single client, so every upload reuses the same connection.
     """
     client = Together(api_key=TOGETHER_API_KEY)
     try:
-        sft_report = check_file(filepath)
-        print(json.dumps(sft_report, indent=4))
-        #assert sft_report["is_check_passed"] == True
+        # Checking a file only reads it locally, so all of them can be checked at once
+        with ThreadPoolExecutor(max_workers=len(filepaths)) as executor:
+            sft_reports = list(executor.map(check_file, filepaths))
+        for filepath, sft_report in zip(filepaths, sft_reports):
+            print(f"{filepath}:")
+            print(json.dumps(sft_report, indent=4))
+            #assert sft_report["is_check_passed"] == True
     except ValueError as e:
         print(f"Error: {e}")
         exit()
 
     # Upload the data to Together
-    train_file_resp = client.files.upload(filepath, check=True)
-    print(train_file_resp.id)  # Save this ID for starting your fine-tuning job
+    for filepath in filepaths:
+        file_resp = client.files.upload(filepath, check=True)
+        print(f"{filepath}: {file_resp.id}")  # Save this ID for starting your fine-tuning job
 
 def main():
     parser = argparse.ArgumentParser(description="Upload files to Together for fine-tuning.")
-    parser.add_argument("-f", "--file", type=str, help="Path to the file to be uploaded.")
+    parser.add_argument("-f", "--file", type=str, nargs='+', help="Paths to the files to be uploaded, e.g. the training and validation files.")
     args = parser.parse_args()
 
-    # Check if the file exists
-    if not os.path.exists(args.file):
-        print(f"File {args.file} does not exist.")
-        return
+    # Check if the files exist
+    for filepath in args.file:
+        if not os.path.exists(filepath):
+            print(f"File {filepath} does not exist.")
+            return
     
-    # Upload the file
+    # Upload the files
     check_and_upload_files(args.file)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -3,6 +3,7 @@ import argparse
 import json
 import sys
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from together import Together
 from typing import List, Dict, Any
@@ -11,14 +12,17 @@ from typing import List, Dict, Any
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 
 from utils.prompts import SYSTEM_PROMPT, get_test_user_prompt
-from utils.parse_resume import parse_resume
+from utils.parse_resume import parse_resume_cached
 from utils.get_resume_analysis import get_resume_analysis
 from utils.get_model_response import get_model_response
 from data_structures.analysis_data import ResumeAnalysis
 
+# Maximum number of requests to the model that are in flight at the same time
+MAX_WORKERS = 16
+
 def fetch_resume_data(resume_path: str) -> str:
     """
-    Fetches resume data from the given path.
+    Fetches resume data from the given path, reusing the converted text from earlier runs when the file is unchanged.
 
     Args:
         resume_path (str): The path to the resume file.
@@ -26,7 +30,7 @@ def fetch_resume_data(resume_path: str) -> str:
     Returns:
         str: The text content of the resume.
     """
-    resume_content = parse_resume(resume_path)
+    resume_content = parse_resume_cached(resume_path)
     return resume_content
 
 def load_annotations(annotations_file_path: str) -> Dict[str, Any]:
@@ -47,16 +51,21 @@ def load_annotations(annotations_file_path: str) -> Dict[str, Any]:
         annotations = json.load(f)
         return annotations
 
-def classify_resume(model: str, data_path: str, response_format: ResumeAnalysis) -> Dict[str, List[ResumeAnalysis]]:
+def classify_resume(model: str, resumes_path: str, jds_path: str, response_format: ResumeAnalysis, max_workers: int = MAX_WORKERS) -> Dict[str, Dict[str, List[ResumeAnalysis]]]:
     """
-    Ranks resumes based on their relevance to the job description.
+    Classifies resumes against every job description.
+    Each (resume, job description) pair is a blocking API call, so the pairs are sent concurrently
+    from a thread pool and the results are grouped back by resume afterwards.
 
     Args:
-        model (str): The model to be used for ranking.
-        train_data (pd.DataFrame): The training data containing resumes and job descriptions.
+        model (str): The model to be used for classification.
+        resumes_path (str): Path to the folder with the resumes.
+        jds_path (str): Path to the job descriptions CSV file.
+        response_format (ResumeAnalysis): The format class of the response expected from the model.
+        max_workers (int): Maximum number of requests in flight at the same time.
 
     Returns:
-        List[ResumeAnalysis]: A list of ResumeAnalysis objects containing the ranking results.
+        Dict[str, Dict[str, List[ResumeAnalysis]]]: The analyses of each resume, keyed by resume ID.
     """
 
     resumes_dir = Path(resumes_path)
@@ -72,29 +81,34 @@ def classify_resume(model: str, data_path: str, response_format: ResumeAnalysis)
         resume_content = fetch_resume_data(file_path)
         resume_texts.append(resume_content)
 
-    jd_df = pd.read_csv(jds_path)
+    jd_df = pd.read_csv(jds_path, engine='pyarrow', dtype_backend='pyarrow')
 
-    analysis_reports: Dict[List[ResumeAnalysis]] = {}
+    # One task per (resume, job description) pair, in the order the results are reported
+    tasks = [
+        (f"Resume_{idx}", resume_text, job_description_text)
+        for idx, resume_text in enumerate(resume_texts[0:2])
+        for job_description_text in jd_df['job_description'].to_numpy()
+    ]
 
-    for idx, resume_text in enumerate(resume_texts[0:2]):
-        
-        res_id = f"Resume_{idx}"
-        res_data = f"{res_id}_data" 
-        res_data = {
-            res_id: [],
-        }
-    
-        for index, jd in jd_df.iterrows():
+    def analyze(task):
+        res_id, resume_text, job_description_text = task
+        user_prompt = get_test_user_prompt(resume_text, job_description_text)
+
+        try:
+            return get_resume_analysis(model, SYSTEM_PROMPT, user_prompt, response_format)
+        except Exception as e:
+            print(f"Error in getting ranking module: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        responses = list(executor.map(analyze, tasks))
 
-            job_description_text = jd['job_description']
-            user_prompt = get_test_user_prompt(resume_text, job_description_text)
+    analysis_reports: Dict[str, Dict[str, List[ResumeAnalysis]]] = {}
 
-            try:
-                response = get_resume_analysis(model, SYSTEM_PROMPT, user_prompt, response_format)
-                res_data[res_id].append(response)
-            except Exception as e:
-                print(f"Error in getting ranking module: {e}")
-        analysis_reports[res_id] = res_data
+    for (res_id, _, _), response in zip(tasks, responses):
+        res_data = analysis_reports.setdefault(res_id, {res_id: []})
+        if response is not None:
+            res_data[res_id].append(response)
     return analysis_reports
 
 def main():
@@ -111,10 +125,11 @@ def main():
 
     curr_dir = Path(__file__).parent
     parent_dir = curr_dir.parent.parent
-    DATA_PATH = args.resume if args.resume else parent_dir / "data" / "test" / "test.csv"
+    RESUMES_PATH = args.resume if args.resume else parent_dir / "data" / "test" / "Resumes"
+    JDS_PATH = args.jobs if args.jobs else parent_dir / "data" / "test" / "JDs.csv"
 
     # Rank the resumes
-    ranked_results = classify_resume(MODEL, DATA_PATH, ResumeAnalysis)
+    ranked_results = classify_resume(MODEL, RESUMES_PATH, JDS_PATH, ResumeAnalysis)
     #print(ranked_results.items())
     
     INFERENCE_FILE_PATH = parent_dir / "data" / "results" / "inference" / "inference.jsonl"
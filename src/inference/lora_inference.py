@@ -1,94 +1,284 @@
 import os
 import argparse
-import json
+import importlib.util
 import sys
+import orjson
 import torch
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Type
+from typing import List, Dict, Any, Type, Optional
 from tqdm import tqdm
-from transformers import AutoProcessor, Gemma3ForConditionalGeneration, AutoTokenizer
+from transformers import AutoProcessor, Gemma3ForConditionalGeneration, AutoTokenizer, BitsAndBytesConfig
 from peft import PeftModel, PeftConfig, get_peft_model
 
 # Add the parent directory to the Python path
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 
-from utils.prompts import SYSTEM_PROMPT, get_test_user_prompt
-from utils.parse_resume import parse_resume
+from utils.prompts import SYSTEM_PROMPT, get_test_user_prompt_parts
+from utils.parse_resume import parse_resume_cached
 from data_structures.analysis_data import ResumeAnalysis
 
-def load_lora_model(base_model_name_or_path, lora_weights_path, device=None):
+# Number of (resume, job description) prompts generated together in one model.generate call
+BATCH_SIZE = 8
+# Number of threads parsing resumes while the model is being loaded
+PARSE_WORKERS = 4
+# Number of threads reading safetensors shards into the page cache before the model is loaded
+PREFETCH_WORKERS = 8
+# Size of each read when prefetching shards
+PREFETCH_CHUNK_SIZE = 16 * 1024 * 1024
+# With torch.compile, prompts are padded to a multiple of this length so only a few input shapes get compiled
+PROMPT_BUCKET = 256
+# Everything in a rendered prompt up to this marker (system prompt + resume) is shared by all job descriptions
+JD_MARKER = "\nJob Description: \n"
+
+def _read_shard(shard_path):
+    """
+    Reads a file sequentially and discards the data, leaving its pages in the OS page cache.
+    """
+    buffer = bytearray(PREFETCH_CHUNK_SIZE)
+    with open(shard_path, 'rb', buffering=0) as f:
+        while f.readinto(buffer):
+            pass
+
+def prefetch_model_shards(model_path):
+    """
+    Warms the OS page cache with the safetensors shards of a local model directory.
+    from_pretrained memory-maps the shards and faults their pages in one at a time; reading all shards in
+    parallel first keeps the disk saturated, so the load afterwards is served from memory.
+    Hugging Face Hub names (not local directories) are skipped.
+    Args:
+        model_path (str): Path or name of the model.
+    """
+    model_dir = Path(model_path)
+    if not model_dir.is_dir():
+        return
+
+    shards = list(model_dir.glob("*.safetensors"))
+    if not shards:
+        return
+
+    print(f"Prefetching {len(shards)} safetensors shards from {model_dir}")
+    with ThreadPoolExecutor(max_workers=PREFETCH_WORKERS) as executor:
+        list(executor.map(_read_shard, shards))
+
+def load_lora_model(base_model_name_or_path, lora_weights_path, device=None, load_in_4bit=False, compile_model=False):
     """
     Loads a Gemma-3 base model and applies LoRA adapters for inference on a local GPU (if available).
     Args:
         base_model_name_or_path (str): Path or name of the base model (Hugging Face Hub or local).
         lora_weights_path (str): Path to the LoRA adapter weights (directory or file).
         device (str, optional): Device to use ('cuda', 'cpu', etc). Defaults to CUDA if available.
+        load_in_4bit (bool): Quantize the base model to 4-bit NF4 with bitsandbytes (CUDA only).
+        compile_model (bool): Use a static KV cache and compile the forward pass with torch.compile (CUDA only).
     Returns:
-        model: The model with LoRA adapters applied.
+        model: The model with LoRA adapters applied (merged into the base weights unless LORA_KEEP_UNMERGED=1
+            or the base model is quantized).
         processor: The processor for the model.
     """
     if device is None:
         device = 'cuda' if torch.cuda.is_available() else 'cpu'
     
-    print(f"Loading Gemma-3 base model from {base_model_name_or_path}")
+    # Use the fused FlashAttention-2 kernels when flash-attn is installed, otherwise PyTorch's SDPA
+    if device == 'cuda' and importlib.util.find_spec("flash_attn") is not None:
+        attn_implementation = "flash_attention_2"
+    else:
+        attn_implementation = "sdpa"
+
+    # 4-bit NF4 weights cut the bytes streamed per decoded token by ~4x; matmuls still run in bf16
+    quantization_config = None
+    if load_in_4bit and device == 'cuda':
+        quantization_config = BitsAndBytesConfig(
+            load_in_4bit=True,
+            bnb_4bit_quant_type="nf4",
+            bnb_4bit_compute_dtype=torch.bfloat16,
+            bnb_4bit_use_double_quant=True
+        )
+
+    prefetch_model_shards(base_model_name_or_path)
+
+    # With several GPUs, spread the layers evenly over all of them instead of filling the first one up
+    device_map = None
+    if device == 'cuda':
+        device_map = "balanced" if torch.cuda.device_count() > 1 else "auto"
+
+    print(f"Loading Gemma-3 base model from {base_model_name_or_path} (attention: {attn_implementation})")
     # Load Gemma-3 model and processor
     base_model = Gemma3ForConditionalGeneration.from_pretrained(
         base_model_name_or_path,
         torch_dtype=torch.bfloat16 if device == 'cuda' else torch.float32,
-        device_map="auto" if device == 'cuda' else None
+        device_map=device_map,
+        attn_implementation=attn_implementation,
+        quantization_config=quantization_config
     ).eval()
     
     processor = AutoProcessor.from_pretrained(base_model_name_or_path)
+    # Pad on the left so that every prompt in a batch ends at the same position and generation starts right after it
+    processor.tokenizer.padding_side = "left"
     
     print(f"Loading LoRA adapters from {lora_weights_path}")
     # Load LoRA adapters
     model = PeftModel.from_pretrained(base_model, lora_weights_path)
+
+    # Fold the adapters into the base weights once, so no forward pass pays for the extra LoRA matmuls.
+    # Set LORA_KEEP_UNMERGED=1 to keep the PEFT wrapper, e.g. to inspect or swap adapters while debugging.
+    # Adapters stay unmerged on a 4-bit base, since merging into quantized weights is lossy.
+    if quantization_config is None and os.getenv("LORA_KEEP_UNMERGED", "0") != "1":
+        model = model.merge_and_unload()
     model.eval()
+
+    # A static KV cache keeps tensor shapes fixed across decode steps, so the compiled forward (CUDA graphs
+    # with "reduce-overhead") is reused for every token instead of re-dispatching each op from Python
+    if compile_model and device == 'cuda':
+        # An unmerged PeftModel generates through the base model's forward (with the LoRA layers injected),
+        # so that is the forward to compile
+        target = model.get_base_model() if isinstance(model, PeftModel) else model
+        target.generation_config.cache_implementation = "static"
+        target.forward = torch.compile(target.forward, mode="reduce-overhead", fullgraph=False, dynamic=False)
+        print("Compiled the model forward pass with a static KV cache")
+
     print(f"Model loaded successfully on {device}")
     return model, processor
 
-def generate_text(model, processor, system_prompt, user_prompt, max_new_tokens=512, temperature=0.3, device=None):
+def build_conversations(system_prompt, user_prompts):
+    """
+    Formats prompts as Gemma-3 chat conversations, one conversation per user prompt.
+    Args:
+        system_prompt (str): The system prompt to guide the model.
+        user_prompts (List[str]): The user prompts.
+    Returns:
+        List[List[Dict]]: The conversations.
+    """
+    return [
+        [
+            {
+                "role": "system",
+                "content": [{"type": "text", "text": system_prompt}]
+            },
+            {
+                "role": "user",
+                "content": [{"type": "text", "text": user_prompt}]
+            }
+        ]
+        for user_prompt in user_prompts
+    ]
+
+def tokenize_prompts(processor, conversations, prefix_cache=None, pad_to_multiple_of=None):
+    """
+    Tokenizes chat conversations for generation, reusing the token ids of the shared prompt prefix.
+    Each rendered prompt is split right after JD_MARKER; the prefix (system prompt + resume) is tokenized once
+    and cached, and only the job description tail is tokenized per prompt.
+    Without a prefix_cache every prompt is tokenized whole.
+    Args:
+        processor: The processor for the model.
+        conversations (List[List[Dict]]): The chat conversations to tokenize.
+        prefix_cache (Dict[str, List[int]], optional): Token ids of the prefixes seen so far, updated in place.
+            It is not locked, so only one thread at a time may tokenize with a given cache.
+        pad_to_multiple_of (int, optional): Pad the batch to a multiple of this length instead of the longest prompt.
+    Returns:
+        BatchEncoding: Left-padded input_ids and attention_mask tensors.
+    """
+    tokenizer = processor.tokenizer
+    texts = processor.apply_chat_template(conversations, add_generation_prompt=True, tokenize=False)
+
+    # The chat template already renders <bos>, so don't let the tokenizer add it again
+    if prefix_cache is None:
+        input_ids = tokenizer(texts, add_special_tokens=False)["input_ids"]
+        return tokenizer.pad({"input_ids": input_ids}, padding=True, pad_to_multiple_of=pad_to_multiple_of, return_tensors="pt")
+
+    prefixes, tails = [], []
+    for text in texts:
+        split_at = text.rfind(JD_MARKER)
+        split_at = split_at + len(JD_MARKER) if split_at != -1 else 0
+        prefixes.append(text[:split_at])
+        tails.append(text[split_at:])
+
+    new_prefixes = [prefix for prefix in dict.fromkeys(prefixes) if prefix not in prefix_cache]
+    if new_prefixes:
+        prefix_ids = tokenizer(new_prefixes, add_special_tokens=False)["input_ids"]
+        prefix_cache.update(zip(new_prefixes, prefix_ids))
+    tail_ids = tokenizer(tails, add_special_tokens=False)["input_ids"]
+
+    input_ids = [prefix_cache[prefix] + ids for prefix, ids in zip(prefixes, tail_ids)]
+    return tokenizer.pad({"input_ids": input_ids}, padding=True, pad_to_multiple_of=pad_to_multiple_of, return_tensors="pt")
+
+def prefix_split_matches(processor, system_prompt, user_prompt):
+    """
+    Checks that tokenizing a prompt as prefix + job description tail (see tokenize_prompts) gives the same token ids
+    as tokenizing the whole chat with apply_chat_template. The split is only exact if no token spans JD_MARKER.
+    Args:
+        processor: The processor for the model.
+        system_prompt (str): The system prompt to guide the model.
+        user_prompt (str): A sample user prompt.
+    Returns:
+        bool: True if both tokenizations are identical.
+    """
+    conversation = build_conversations(system_prompt, [user_prompt])
+    expected = processor.apply_chat_template(
+        conversation,
+        add_generation_prompt=True,
+        tokenize=True,
+        return_dict=True,
+        return_tensors="pt"
+    )["input_ids"][0].tolist()
+    actual = tokenize_prompts(processor, conversation, {})["input_ids"][0].tolist()
+    return actual == expected
+
+def prepare_inputs(processor, system_prompt, user_prompts, prefix_cache=None, pad_to_multiple_of=None):
+    """
+    Builds the left-padded model inputs for a batch of prompts on the CPU.
+    Args:
+        processor: The processor for the model.
+        system_prompt (str): The system prompt to guide the model.
+        user_prompts (List[str]): The user prompts to generate text from.
+        prefix_cache (Dict[str, List[int]], optional): Token ids of shared prompt prefixes, reused across calls.
+            Without it every prompt is tokenized whole.
+        pad_to_multiple_of (int, optional): Pad the batch to a multiple of this length instead of the longest prompt.
+    Returns:
+        BatchEncoding: The input_ids and attention_mask tensors (in pinned memory when CUDA is available).
+    """
+    # Format messages for Gemma-3 model, one conversation per prompt
+    conversations = build_conversations(system_prompt, user_prompts)
+
+    # Tokenize the inputs, reusing the cached system prompt + resume prefix
+    inputs = tokenize_prompts(processor, conversations, prefix_cache, pad_to_multiple_of)
+
+    # Page-locked host memory lets generate_text copy the inputs to the GPU asynchronously
+    if torch.cuda.is_available():
+        for key in list(inputs.keys()):
+            inputs[key] = inputs[key].pin_memory()
+
+    return inputs
+
+def generate_text(model, processor, system_prompt, user_prompts, max_new_tokens=512, temperature=0.3, device=None,
+                  prefix_cache=None, inputs=None):
     """
-    Runs inference with the Gemma-3 model and LoRA adapters on the provided prompt.
+    Runs inference with the Gemma-3 model and LoRA adapters on a batch of prompts.
+    All prompts are padded into one batch and generated with a single model.generate call.
     Args:
         model: The model with LoRA adapters applied.
         processor: The processor for the model.
         system_prompt (str): The system prompt to guide the model.
-        user_prompt (str): The user prompt to generate text from.
+        user_prompts (List[str]): The user prompts to generate text from.
         max_new_tokens (int): Maximum number of new tokens to generate.
         temperature (float): Temperature for sampling.
         device (str, optional): Device to use. Defaults to CUDA if available.
+        prefix_cache (Dict[str, List[int]], optional): Token ids of shared prompt prefixes, reused across calls.
+        inputs (BatchEncoding, optional): Inputs already built with prepare_inputs for these prompts.
     Returns:
-        str: The generated text.
+        List[str]: The generated text for each prompt, in the same order.
     """
     if device is None:
         device = 'cuda' if torch.cuda.is_available() else 'cpu'
-    
-    # Format messages for Gemma-3 model
-    messages = [
-        {
-            "role": "system",
-            "content": [{"type": "text", "text": system_prompt}]
-        },
-        {
-            "role": "user",
-            "content": [{"type": "text", "text": user_prompt}]
-        }
-    ]
-    
-    # Process input using the processor
-    inputs = processor.apply_chat_template(
-        messages, 
-        add_generation_prompt=True, 
-        tokenize=True,
-        return_dict=True, 
-        return_tensors="pt"
-    ).to(model.device, dtype=torch.bfloat16)
+    if inputs is None:
+        inputs = prepare_inputs(processor, system_prompt, user_prompts, prefix_cache)
+    # The copy from pinned memory is queued on the current stream ahead of the first forward pass, so the host
+    # doesn't wait for it to finish
+    inputs = {key: value.to(model.device, non_blocking=True) for key, value in inputs.items()}
     
     input_len = inputs["input_ids"].shape[-1]
     
-    # Generate response
+    # Generate responses; inputs carries the attention_mask so padding is ignored
     with torch.inference_mode():
         generation = model.generate(
             **inputs, 
@@ -97,9 +287,78 @@ def generate_text(model, processor, system_prompt, user_prompt, max_new_tokens=5
             do_sample=(temperature > 0),
             top_p=0.95,
         )
-        generation = generation[0][input_len:]
+        generation = generation[:, input_len:]
     
-    return processor.decode(generation, skip_special_tokens=True)
+    return processor.batch_decode(generation, skip_special_tokens=True)
+
+def load_vllm_engine(base_model_name_or_path, kv_cache_dtype="auto", tensor_parallel_size=1):
+    """
+    Loads the Gemma-3 base model into a vLLM engine with LoRA support, as an alternative to load_lora_model.
+    vLLM schedules all prompts with continuous batching and a paged KV cache, and with prefix caching the
+    shared system prompt and resume at the start of each prompt are only prefilled once.
+    With tensor_parallel_size > 1 the model is sharded with tensor parallelism over that many GPUs.
+    vLLM is an optional dependency and is only imported when this engine is used.
+    Args:
+        base_model_name_or_path (str): Path or name of the base model (Hugging Face Hub or local).
+        kv_cache_dtype (str): "auto" keeps the KV cache in the model dtype (bf16); "fp8" stores it in FP8,
+            halving the KV-cache memory read per decoded token while the weights stay in bf16.
+        tensor_parallel_size (int): Number of GPUs to shard the model over. It must divide the model's number
+            of attention heads, e.g. 1, 2, 4 or 8 for Gemma-3.
+    Returns:
+        llm: The vLLM engine.
+    """
+    from vllm import LLM
+
+    print(f"Loading Gemma-3 base model into vLLM from {base_model_name_or_path} on {tensor_parallel_size} GPU(s)")
+    llm = LLM(
+        model=str(base_model_name_or_path),
+        dtype="bfloat16",
+        tensor_parallel_size=tensor_parallel_size,
+        enable_lora=True,
+        max_loras=1,
+        enable_prefix_caching=True,
+        kv_cache_dtype=kv_cache_dtype,
+    )
+    return llm
+
+def generate_text_vllm(llm, lora_weights_path, system_prompt, user_prompts, max_new_tokens=512, temperature=0.3,
+                       response_format=None):
+    """
+    Runs inference with the vLLM engine and LoRA adapters on the provided prompts.
+    Args:
+        llm: The vLLM engine (see load_vllm_engine).
+        lora_weights_path (str): Path to the LoRA adapter weights (directory).
+        system_prompt (str): The system prompt to guide the model.
+        user_prompts (List[str]): The user prompts to generate text from.
+        max_new_tokens (int): Maximum number of new tokens to generate.
+        temperature (float): Temperature for sampling.
+        response_format (Type[BaseModel], optional): Pydantic model whose JSON schema constrains the output.
+    Returns:
+        List[str]: The generated text for each prompt, in the same order.
+    """
+    from vllm import SamplingParams
+    from vllm.lora.request import LoRARequest
+    from vllm.sampling_params import GuidedDecodingParams
+
+    conversations = [
+        [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+        for user_prompt in user_prompts
+    ]
+
+    # Constrain decoding to the response schema, so every output parses and no tokens go to invalid continuations
+    guided_decoding = None
+    if response_format is not None:
+        guided_decoding = GuidedDecodingParams(json=response_format.model_json_schema())
+
+    sampling_params = SamplingParams(temperature=temperature, top_p=0.95, max_tokens=max_new_tokens,
+                                     guided_decoding=guided_decoding)
+    lora_request = LoRARequest("adapter", 1, str(lora_weights_path))
+
+    outputs = llm.chat(conversations, sampling_params, lora_request=lora_request)
+    return [output.outputs[0].text for output in outputs]
 
 def fetch_resume_data(resume_path: str) -> str:
     """
@@ -111,41 +370,128 @@ def fetch_resume_data(resume_path: str) -> str:
     Returns:
         str: The text content of the resume.
     """
-    resume_content = parse_resume(resume_path)
+    resume_content = parse_resume_cached(resume_path)
     return resume_content
 
-def get_lora_resume_analysis(model, processor, sys_prompt: str, user_prompt: str, 
-                            response_format: Type[ResumeAnalysis] | ResumeAnalysis) -> str:
+def get_lora_resume_analysis(model, processor, sys_prompt: str, user_prompts: List[str], 
+                            response_format: Type[ResumeAnalysis] | ResumeAnalysis,
+                            prefix_cache: Optional[Dict[str, List[int]]] = None, inputs=None) -> List[str]:
     """
-    Gets resume analysis using the Gemma-3 LoRA model.
+    Gets resume analyses for a batch of prompts using the Gemma-3 LoRA model.
     
     Args:
         model: The LoRA model.
         processor: The processor for the model.
         sys_prompt (str): The system prompt.
-        user_prompt (str): The user prompt.
+        user_prompts (List[str]): The user prompts.
         response_format: The expected response format.
+        prefix_cache (Dict[str, List[int]], optional): Token ids of shared prompt prefixes, reused across calls.
+        inputs (BatchEncoding, optional): Inputs already built with prepare_inputs for these prompts.
         
     Returns:
-        str: The analysis result.
+        List[str]: The analysis result of each prompt, in the same order.
     """
     assert isinstance(sys_prompt, str), "sys_prompt must be a string"
-    assert isinstance(user_prompt, str), "user_prompt must be a string"
+    assert all(isinstance(user_prompt, str) for user_prompt in user_prompts), "user_prompts must be strings"
     assert response_format == ResumeAnalysis or isinstance(response_format, ResumeAnalysis), \
         "response_format must be a ResumeAnalysis class or instance"
     
     try:
-        response = generate_text(model, processor, sys_prompt, user_prompt)
-        return response
+        responses = generate_text(model, processor, sys_prompt, user_prompts, prefix_cache=prefix_cache, inputs=inputs)
+        return responses
     except Exception as e:
         print(f"Error in get_lora_resume_analysis(): {e}")
-        return ""
+        return [""] * len(user_prompts)
+
+def write_resume_line(f, res_id: str, responses: List[str]):
+    """
+    Appends the results of one resume to the JSONL output file as {res_id: [response, ...]}.
+
+    Args:
+        f: The output file, opened in binary mode.
+        res_id (str): The resume ID.
+        responses (List[str]): The analysis of the resume for each job description, in order.
+    """
+    f.write(orjson.dumps({res_id: responses}))
+    f.write(b"\n")
+    f.flush()
+
+def generate_and_write(model, processor, pending: List[str], res_ids: List[str], num_jds: int,
+                       response_format: ResumeAnalysis, f, batch_size: int = BATCH_SIZE, compile_model: bool = False):
+    """
+    Generates the analyses of all prompts with the Hugging Face model in length-sorted batches, and writes each
+    resume's line as soon as it and every resume before it are complete.
+
+    Args:
+        model: The LoRA model.
+        processor: The processor for the model.
+        pending (List[str]): One user prompt per (resume, job description) pair, resume-major.
+        res_ids (List[str]): The resume IDs, in output order.
+        num_jds (int): The number of job descriptions per resume.
+        response_format (ResumeAnalysis): The format class or instance for the response.
+        f: The output file, opened in binary mode.
+        batch_size (int): Number of prompts generated together in one batch.
+        compile_model (bool): Whether the model was compiled, in which case prompts are padded to PROMPT_BUCKET.
+    """
+    # The tokenized system prompt + resume prefixes are shared across batches, provided that splitting the prompts
+    # there reproduces the tokenization of the whole prompt. Only the prepare thread below touches the cache.
+    prefix_cache: Optional[Dict[str, List[int]]] = None
+    if pending:
+        if prefix_split_matches(processor, SYSTEM_PROMPT, pending[0]):
+            prefix_cache = {}
+        else:
+            print("Warning: Tokenizing the prompt prefix separately changes the token ids; tokenizing whole prompts instead")
+
+    # Batch prompts of similar length together so little compute goes to padding. The system prompt is the same
+    # for every prompt, so the user prompt's character length is enough to order them.
+    order = sorted(range(len(pending)), key=lambda i: len(pending[i]))
+    batches = [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+    responses_by_index = [""] * len(pending)
+    remaining = [num_jds] * len(res_ids)
+    next_resume = 0
+
+    def prepare_batch(batch):
+        return prepare_inputs(processor, SYSTEM_PROMPT, [pending[i] for i in batch], prefix_cache,
+                              PROMPT_BUCKET if compile_model else None)
+
+    def write_ready_resumes():
+        nonlocal next_resume
+        while next_resume < len(res_ids) and remaining[next_resume] == 0:
+            start = next_resume * num_jds
+            write_resume_line(f, res_ids[next_resume], responses_by_index[start:start + num_jds])
+            # The responses are on disk now, so don't keep them around
+            responses_by_index[start:start + num_jds] = [None] * num_jds
+            next_resume += 1
+
+    # Tokenize the next batch on a background thread while the GPU generates the current one
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        next_inputs = executor.submit(prepare_batch, batches[0]) if batches else None
+        for batch_idx, batch in enumerate(tqdm(batches, desc="Analyzing Resumes and Job Descriptions")):
+            try:
+                inputs = next_inputs.result()
+            except Exception:
+                # Tokenize again inside get_lora_resume_analysis, which reports the error. That happens on this
+                # thread while the next batch is being prepared, so it must not share the prefix cache
+                inputs = None
+            if batch_idx + 1 < len(batches):
+                next_inputs = executor.submit(prepare_batch, batches[batch_idx + 1])
+            responses = get_lora_resume_analysis(model, processor, SYSTEM_PROMPT, [pending[i] for i in batch], 
+                                                 response_format, None, inputs)
+            for idx, response in zip(batch, responses):
+                responses_by_index[idx] = response
+                remaining[idx // num_jds] -= 1
+            write_ready_resumes()
+
+    write_ready_resumes()
 
 def rank_resumes_with_lora(base_model_path: str, lora_weights_path: str, 
                          resumes_path: str, jds_path: str, 
-                         response_format: ResumeAnalysis) -> Dict[str, List[ResumeAnalysis]]:
+                         response_format: ResumeAnalysis, output_file_path: Path, batch_size: int = BATCH_SIZE, 
+                         engine: str = "hf", load_in_4bit: bool = False, compile_model: bool = False,
+                         kv_cache_dtype: str = "auto", tensor_parallel_size: int = 1) -> None:
     """
     Ranks resumes based on their relevance to the job description using a Gemma-3 LoRA model.
+    Results are streamed to output_file_path as JSONL, one {res_id: [response, ...]} line per resume.
 
     Args:
         base_model_path (str): Path to the base model.
@@ -153,54 +499,68 @@ def rank_resumes_with_lora(base_model_path: str, lora_weights_path: str,
         resumes_path (str): Path to the directory containing resumes.
         jds_path (str): Path to the job descriptions CSV file.
         response_format (ResumeAnalysis): The format class or instance for the response.
-
-    Returns:
-        Dict[str, List[ResumeAnalysis]]: A dictionary mapping resume IDs to their analysis results.
+        output_file_path (Path): Path of the JSONL file the results are written to.
+        batch_size (int): Number of prompts generated together in one batch (Hugging Face engine only).
+        engine (str): "hf" to generate with transformers + PEFT, or "vllm" to use a vLLM engine.
+        load_in_4bit (bool): Quantize the base model to 4-bit with bitsandbytes (Hugging Face engine only).
+        compile_model (bool): Compile the model with a static KV cache (Hugging Face engine only).
+        kv_cache_dtype (str): "auto" or "fp8" for the KV cache (vLLM engine only).
+        tensor_parallel_size (int): Number of GPUs to shard the model over (vLLM engine only).
     """
     device = 'cuda' if torch.cuda.is_available() else 'cpu'
     print(f"Using device: {device}")
-    
-    # Load the model with LoRA adapters
-    model, processor = load_lora_model(base_model_path, lora_weights_path, device)
 
     resumes_dir = Path(resumes_path)
     if not resumes_dir.is_dir():
         print(f"Error: {resumes_path} is not a valid directory")
-        return {}
+        return
     
-    resume_texts = []
     resume_files = list(resumes_dir.glob("*.docx"))
-    
     print(f"Found {len(resume_files)} resume files")
-    for file_path in resume_files:
-        print(f"Processing resume: {file_path.name}")
-        resume_content = fetch_resume_data(file_path)
-        resume_texts.append(resume_content)
 
-    jd_df = pd.read_csv(jds_path)
-    print(f"Loaded {len(jd_df)} job descriptions")
+    # Parse the resumes in the background while the model weights are loading
+    with ThreadPoolExecutor(max_workers=PARSE_WORKERS) as executor:
+        resume_futures = executor.map(fetch_resume_data, resume_files)
+        jd_future = executor.submit(pd.read_csv, jds_path)
 
-    analysis_reports: Dict[str, List[ResumeAnalysis]] = {}
+        # Load the model with LoRA adapters
+        if engine == "vllm":
+            llm = load_vllm_engine(base_model_path, kv_cache_dtype=kv_cache_dtype, tensor_parallel_size=tensor_parallel_size)
+        else:
+            model, processor = load_lora_model(base_model_path, lora_weights_path, device, 
+                                               load_in_4bit=load_in_4bit, compile_model=compile_model)
 
-    for idx, resume_text in tqdm(enumerate(resume_texts), desc="Analyzing Resumes"):
-        res_id = f"Resume_{idx+1}"
-        res_data = {
-            res_id: [],
-        }
-    
-        for index, jd in tqdm(jd_df.iterrows(), desc=f"Analyzing Job Descriptions for {res_id}"):
-            job_description_text = jd['job_description']
-            user_prompt = get_test_user_prompt(resume_text, job_description_text)
+        resume_texts = list(resume_futures)
+        jd_df = jd_future.result()
 
-            try:
-                response = get_lora_resume_analysis(model, processor, SYSTEM_PROMPT, user_prompt, response_format)
-                res_data[res_id].append(response)
-            except Exception as e:
-                print(f"Error in getting ranking for {res_id} with job {index}: {e}")
+    print(f"Parsed {len(resume_texts)} resumes")
+    job_descriptions = [job_description_text.strip() for job_description_text in jd_df['job_description'].tolist()]
+    print(f"Loaded {len(job_descriptions)} job descriptions")
 
-        analysis_reports[res_id] = res_data[res_id]
+    # One prompt per (resume, job description) pair, in the order the results are reported
+    res_ids = [f"Resume_{idx+1}" for idx in range(len(resume_texts))]
+    num_jds = len(job_descriptions)
+    pending = [
+        prompt_prefix + job_description_text + prompt_suffix
+        for prompt_prefix, prompt_suffix in map(get_test_user_prompt_parts, resume_texts)
+        for job_description_text in job_descriptions
+    ]
+
+    # Write into a temporary file and move it into place at the end, so an interrupted run never leaves a
+    # truncated file behind under the final name
+    output_file_path = Path(output_file_path)
+    tmp_file_path = output_file_path.with_suffix(".tmp.jsonl")
+    with open(tmp_file_path, 'wb') as f:
+        if engine == "vllm":
+            # vLLM does its own batching, so hand it every prompt at once
+            responses = generate_text_vllm(llm, lora_weights_path, SYSTEM_PROMPT, pending, 
+                                           response_format=response_format)
+            for idx, res_id in enumerate(res_ids):
+                write_resume_line(f, res_id, responses[idx * num_jds:(idx + 1) * num_jds])
+        else:
+            generate_and_write(model, processor, pending, res_ids, num_jds, response_format, f, batch_size, compile_model)
 
-    return analysis_reports
+    os.replace(tmp_file_path, output_file_path)
 
 def main():
     parser = argparse.ArgumentParser(description="Rank resumes using a Gemma-3 LoRA model on a local GPU.")
@@ -208,6 +568,11 @@ def main():
     parser.add_argument("-j", "--jobs", type=str, help="Path to the job description file.")
     parser.add_argument("-b", "--base_model", type=str, help="Path or name of the Gemma-3 base model.")
     parser.add_argument("-l", "--lora", type=str, help="Path to the LoRA adapter weights.")
+    parser.add_argument("-e", "--engine", type=str, choices=["hf", "vllm"], default="hf", help="Inference engine: Hugging Face transformers (default) or vLLM (requires the vllm package).")
+    parser.add_argument("--load_in_4bit", action="store_true", help="Quantize the base model to 4-bit NF4 (requires the bitsandbytes package and a CUDA GPU).")
+    parser.add_argument("--compile", action="store_true", help="Compile the model with torch.compile and a static KV cache (CUDA only).")
+    parser.add_argument("--kv_cache_dtype", type=str, choices=["auto", "fp8"], default="auto", help="Data type of the KV cache: the model dtype (default) or FP8 (vLLM engine only).")
+    parser.add_argument("--tensor_parallel_size", type=int, default=1, help="Number of GPUs to shard the model over; must divide the model's number of attention heads (vLLM engine only).")
     args = parser.parse_args()
 
     # Set default values if not provided
@@ -223,19 +588,21 @@ def main():
     print(f"LoRA weights: {LORA_WEIGHTS}")
     print(f"Resumes path: {RESUMES_PATH}")
     print(f"Job descriptions path: {JDS_PATH}")
+    print(f"Engine: {args.engine}")
+    print(f"4-bit quantization: {args.load_in_4bit}")
+    print(f"Compile: {args.compile}")
+    print(f"KV cache dtype: {args.kv_cache_dtype}")
+    print(f"Tensor parallel size: {args.tensor_parallel_size}")
 
-    ranked_results = rank_resumes_with_lora(BASE_MODEL, LORA_WEIGHTS, RESUMES_PATH, JDS_PATH, ResumeAnalysis)
-    
     # Create the output directory if it doesn't exist
     output_dir = parent_dir / "data" / "results" / "inference"
     output_dir.mkdir(parents=True, exist_ok=True)
     
     INFERENCE_FILE_PATH = output_dir / "lora_inference.jsonl"
 
-    with open(INFERENCE_FILE_PATH, 'w', encoding='utf-8') as f:
-        for k, v in ranked_results.items():
-            json_line = json.dumps({k: v}, ensure_ascii=False)
-            f.write(json_line + '\n')
+    rank_resumes_with_lora(BASE_MODEL, LORA_WEIGHTS, RESUMES_PATH, JDS_PATH, ResumeAnalysis, INFERENCE_FILE_PATH,
+                           engine=args.engine, load_in_4bit=args.load_in_4bit, compile_model=args.compile,
+                           kv_cache_dtype=args.kv_cache_dtype, tensor_parallel_size=args.tensor_parallel_size)
     
     print("Inference completed. Results saved to:", INFERENCE_FILE_PATH)
 
@@ -1,5 +1,6 @@
 import os
 import argparse
+import asyncio
 import json
 import sys
 import pandas as pd
@@ -10,14 +11,17 @@ from tqdm import tqdm
 # Add the parent directory to the Python path
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 
-from utils.prompts import SYSTEM_PROMPT, get_test_user_prompt
-from utils.parse_resume import parse_resume
-from utils.get_resume_analysis import get_resume_analysis
+from utils.prompts import SYSTEM_PROMPT, get_test_user_prompt_parts
+from utils.parse_resume import parse_resume_cached
+from utils.get_resume_analysis import get_resume_analysis_async
 from data_structures.analysis_data import ResumeAnalysis
 
+# Maximum number of requests to the Together.ai API in flight at the same time
+MAX_CONCURRENT_REQUESTS = 16
+
 def fetch_resume_data(resume_path: str) -> str:
     """
-    Fetches resume data from the given path.
+    Fetches resume data from the given path, reusing the converted text from earlier runs when the file is unchanged.
 
     Args:
         resume_path (str): The path to the resume file.
@@ -25,20 +29,24 @@ def fetch_resume_data(resume_path: str) -> str:
     Returns:
         str: The text content of the resume.
     """
-    resume_content = parse_resume(resume_path)
+    resume_content = parse_resume_cached(resume_path)
     return resume_content
 
 
-def rank_resumes(model: str, resumes_path: str, jds_path: str,  response_format: ResumeAnalysis, output_file_path: Path) -> Dict[str, List[ResumeAnalysis]]:
+async def rank_resumes(model: str, resumes_path: str, jds_path: str,  response_format: ResumeAnalysis, output_file_path: Path,
+                       max_concurrent_requests: int = MAX_CONCURRENT_REQUESTS) -> None:
     """
     Ranks resumes based on their relevance to the job description.
+    Results are written to output_file_path as JSONL, one {res_id: [response, ...]} line per resume.
+    Requests for all (resume, job description) pairs are sent concurrently, at most max_concurrent_requests at a time.
 
     Args:
         model (str): The model to be used for ranking.
-        train_data (pd.DataFrame): The training data containing resumes and job descriptions.
-
-    Returns:
-        List[ResumeAnalysis]: A list of ResumeAnalysis objects containing the ranking results.
+        resumes_path (str): Path to the directory containing resumes.
+        jds_path (str): Path to the job descriptions CSV file.
+        response_format (ResumeAnalysis): The format class or instance for the response.
+        output_file_path (Path): Path of the JSONL file the results are written to.
+        max_concurrent_requests (int): Maximum number of requests in flight at the same time.
     """
 
     resumes_dir = Path(resumes_path)
@@ -62,36 +70,35 @@ def rank_resumes(model: str, resumes_path: str, jds_path: str,  response_format:
         resume_data.append((file_path.name, resume_content))
 
     jd_df = pd.read_csv(jds_path)
+    job_descriptions = [job_description_text.strip() for job_description_text in jd_df['job_description'].tolist()]
+
+    semaphore = asyncio.Semaphore(max_concurrent_requests)
 
-    analysis_reports: Dict[str, List[str]] = {}
+    async def analyze(user_prompt: str) -> str:
+        async with semaphore:
+            return await get_resume_analysis_async(model, SYSTEM_PROMPT, user_prompt, response_format)
+
+    # Start the requests of every resume up front; the semaphore bounds how many are in flight
+    resume_tasks = []
+    for idx, (filename, resume_text) in enumerate(resume_data[5:6]):
+        res_id = f"Resume_{idx+1}"
+        prompt_prefix, prompt_suffix = get_test_user_prompt_parts(resume_text)
+        tasks = [
+            asyncio.create_task(analyze(prompt_prefix + job_description_text + prompt_suffix))
+            for job_description_text in job_descriptions
+        ]
+        resume_tasks.append((res_id, tasks))
 
     with open(output_file_path, 'w', encoding='utf-8') as f:
 
-        for idx, (filename, resume_text) in tqdm(enumerate(resume_data[5:6]), desc="Analyzing Resumes and generating analysis reports"):
+        # Write each resume's line, in order, as soon as all of its analyses are back
+        for res_id, tasks in tqdm(resume_tasks, desc="Analyzing Resumes and generating analysis reports"):
             
-            # Use original filename in the ID
-            res_id = f"Resume_{idx+1}"
-            # Include filename in the data structure
-            res_data = f"{res_id}_data" 
-            res_data = {
-                res_id: [],
-            }
-        
-            for index, jd in tqdm(jd_df.iterrows(), desc=f"Analyzing Job Descriptions for {res_id}"):
-
-                job_description_text = jd['job_description']
-                user_prompt = get_test_user_prompt(resume_text, job_description_text)
-                if res_id not in analysis_reports:
-                    analysis_reports[res_id] = []
-                analysis_reports[res_id].append(user_prompt)
-                response = get_resume_analysis(model, SYSTEM_PROMPT, user_prompt, response_format)
-                res_data[res_id].append(response)
-
-            json_line = json.dumps(res_data, ensure_ascii=False)
+            responses = await asyncio.gather(*tasks)
+
+            json_line = json.dumps({res_id: responses}, ensure_ascii=False)
             f.write(json_line + '\n')
             f.flush()
-            
-    return analysis_reports
 
 def main():
     parser = argparse.ArgumentParser(description="Rank resumes based on their relevance to the job description.")
@@ -111,7 +118,7 @@ def main():
     JDS_PATH = args.jobs if args.jobs else parent_dir / "data" / "test" / "JDs.csv"
     INFERENCE_FILE_PATH = parent_dir / "data" / "results" / "inference" / "inference.jsonl"
 
-    ranked_results = rank_resumes(MODEL, RESUMES_PATH, JDS_PATH, ResumeAnalysis, INFERENCE_FILE_PATH)
+    asyncio.run(rank_resumes(MODEL, RESUMES_PATH, JDS_PATH, ResumeAnalysis, INFERENCE_FILE_PATH))
     
     print("Inference completed. Results saved to: ", INFERENCE_FILE_PATH)
     
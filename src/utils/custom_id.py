@@ -0,0 +1,37 @@
+import hashlib
+from collections import Counter
+from typing import List
+
+def get_custom_id(resume_text: str, job_description_text: str, occurrence: int = 0) -> str:
+    """ This function returns a stable identifier for a (resume, job description) pair, used to match
+    distillation results back to their training row and to skip rows that were already processed.
+
+    Args:
+        resume_text (str): The text of the resume.
+        job_description_text (str): The text of the job description.
+        occurrence (int): How many earlier rows hold the same pair. The dataset has duplicate rows, and each copy needs its own id.
+
+    Returns:
+        str: A 16 character hex digest of the pair.
+    """
+    # The first occurrence keeps the plain pair digest so ids recorded by earlier runs still match
+    pair = f"{resume_text}\x00{job_description_text}" if occurrence == 0 else f"{resume_text}\x00{job_description_text}\x00{occurrence}"
+    return hashlib.blake2b(pair.encode("utf-8"), digest_size=8).hexdigest()
+
+def get_custom_ids(resumes: List[str], job_descriptions: List[str]) -> List[str]:
+    """ This function returns one unique identifier per training row (see get_custom_id), numbering repeated pairs in row order.
+
+    Args:
+        resumes (List[str]): The resume text of each row.
+        job_descriptions (List[str]): The job description text of each row.
+
+    Returns:
+        List[str]: The custom_id of each row, in row order.
+    """
+    seen = Counter()
+    custom_ids = []
+    for resume_text, job_description_text in zip(resumes, job_descriptions):
+        pair = (resume_text, job_description_text)
+        custom_ids.append(get_custom_id(resume_text, job_description_text, seen[pair]))
+        seen[pair] += 1
+    return custom_ids
@@ -0,0 +1,41 @@
+import os
+import threading
+import httpx
+from google import genai
+from google.genai import types
+
+# Size of the connection pool shared by all requests to the Gemini API
+MAX_CONNECTIONS = 100
+
+_CLIENT: genai.Client = None
+_CLIENT_LOCK = threading.Lock()
+
+def get_genai_client() -> genai.Client:
+    """ This function returns a Gemini client that is created once per process and reused, so that
+    every request goes over an already open (HTTP/2) connection instead of paying for a new TCP/TLS handshake.
+
+    Returns:
+        genai.Client: The shared Gemini client.
+    """
+    global _CLIENT
+
+    if _CLIENT is None:
+        # Worker threads may ask for the client at the same time; only the first one creates it
+        with _CLIENT_LOCK:
+            if _CLIENT is None:
+                try:
+                    GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+                except Exception as e:
+                    print(f"Error: {e}")
+                    exit()
+
+                limits = httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS)
+                _CLIENT = genai.Client(
+                    api_key=GEMINI_API_KEY,
+                    http_options=types.HttpOptions(
+                        client_args={"limits": limits},
+                        async_client_args={"limits": limits, "http2": True},
+                    ),
+                )
+
+    return _CLIENT
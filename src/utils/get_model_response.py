@@ -5,6 +5,7 @@ from together import Together
 from google import genai
 from google.genai import types
 from data_structures.analysis_data import ResumeAnalysis
+from utils.genai_client import get_genai_client
 
     
 def get_model_response(model:str, sys_prompt:str, user_prompt:str, response_format:Type[ResumeAnalysis] | ResumeAnalysis)->str:
@@ -26,14 +27,9 @@ def get_model_response(model:str, sys_prompt:str, user_prompt:str, response_form
     assert response_format == ResumeAnalysis or isinstance(response_format, ResumeAnalysis), "response_format must be a ResumeAnalysis class or instance"
     
     analysis: ResumeAnalysis = None
-    
-    try:
-        GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-    except Exception as e:
-        print(f"Error: {e}")
-        exit()
 
-    client = genai.Client(api_key=GEMINI_API_KEY)
+    # Reuse the process-wide client and its open connections instead of building a new one per call
+    client = get_genai_client()
        
     try:
 
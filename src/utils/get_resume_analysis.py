@@ -1,8 +1,65 @@
 import os
 import json
+import threading
 from typing import Any, Dict, List, Type
-from together import Together
+from together import Together, AsyncTogether
 from data_structures.analysis_data import ResumeAnalysis
+from utils.retry import retry_with_backoff, retry_async
+
+_ASYNC_CLIENT: AsyncTogether = None
+_ASYNC_CLIENT_LOCK = threading.Lock()
+
+def get_async_together_client() -> AsyncTogether:
+    """ This function returns an async Together.ai client that is created once per process and reused by every request,
+    so concurrent requests share its connection pool.
+
+    Returns:
+        AsyncTogether: The shared async client.
+    """
+    global _ASYNC_CLIENT
+
+    if _ASYNC_CLIENT is None:
+        # Several threads may ask for the client at the same time; only the first one creates it
+        with _ASYNC_CLIENT_LOCK:
+            if _ASYNC_CLIENT is None:
+                _ASYNC_CLIENT = AsyncTogether(api_key=os.getenv("TOGETHER_API_KEY"))
+
+    return _ASYNC_CLIENT
+
+def build_request(model:str, sys_prompt:str, user_prompt:str, response_format:Type[ResumeAnalysis] | ResumeAnalysis)->Dict[str, Any]:
+    """ This function validates the arguments of a resume analysis and builds the chat completion request for them.
+    It is shared by get_resume_analysis and get_resume_analysis_async.
+
+    Args:
+        model (str): The model to be used for analysis.
+        sys_prompt (str): The system prompt to guide the model's response.
+        user_prompt (str): The user's input prompt with the task query.
+        response_format (Type[ResumeAnalysis] | ResumeAnalysis): The format class or instance of response expected from the model.
+
+    Returns:
+        Dict[str, Any]: The keyword arguments of client.chat.completions.create.
+    """
+    assert isinstance(model, str), "model name must be a string"
+    assert isinstance(user_prompt, str), "user_prompt must be a string"
+    assert isinstance(sys_prompt, str), "sys_prompt must be a string"
+    assert response_format == ResumeAnalysis or isinstance(response_format, ResumeAnalysis), "response_format must be a ResumeAnalysis class or instance"
+
+    return {
+        "messages": [{"role": "system", "content": sys_prompt}, {"role": "user", "content": user_prompt}],
+        "model": model,
+        "temperature": 0.7,
+    }
+
+def parse_response(response: Any) -> str:
+    """ This function extracts the generated text from a chat completion response.
+
+    Args:
+        response (Any): The response returned by client.chat.completions.create.
+
+    Returns:
+        str: The generated response from the model.
+    """
+    return response.choices[0].message.content
 
 def get_resume_analysis(model:str, sys_prompt:str, user_prompt:str, response_format:Type[ResumeAnalysis] | ResumeAnalysis)->str:
     """ This function takes a user prompt and a system prompt, and returns the generated response of the model specified.
@@ -17,10 +74,7 @@ def get_resume_analysis(model:str, sys_prompt:str, user_prompt:str, response_for
         str: The generated response from the model.
     
     """
-    assert isinstance(model, str), "model name must be a string"
-    assert isinstance(user_prompt, str), "user_prompt must be a string"
-    assert isinstance(sys_prompt, str), "sys_prompt must be a string"
-    assert response_format == ResumeAnalysis or isinstance(response_format, ResumeAnalysis), "response_format must be a ResumeAnalysis class or instance"
+    request = build_request(model, sys_prompt, user_prompt, response_format)
     
     analysis: ResumeAnalysis = None
 
@@ -34,17 +88,43 @@ def get_resume_analysis(model:str, sys_prompt:str, user_prompt:str, response_for
         
     try:
 
-        response = client.chat.completions.create(
-            messages=[{"role": "system", "content": sys_prompt}, {"role": "user", "content": user_prompt}],
-            model=model,
-            temperature=0.7,
-        )
-
-        analysis = response.choices[0].message.content 
+        # Rate limits (429) and server errors are retried with backoff; other errors fall through to the handler below
+        response = retry_with_backoff(client.chat.completions.create, **request)
+        analysis = parse_response(response)
     
     except Exception as e:
 
         print(f"Error in get_resume_analysis(): {e}")
         analysis = ""  
 
-    return analysis
\ No newline at end of file
+    return analysis
+
+async def get_resume_analysis_async(model:str, sys_prompt:str, user_prompt:str, response_format:Type[ResumeAnalysis] | ResumeAnalysis)->str:
+    """ This function is the asynchronous counterpart of get_resume_analysis, so that many requests can be in flight at once.
+    
+    Args:
+        model (str): The model to be used for analysis. Options:"Any model available through Together.ai API".
+        user_prompt (str): The user's input prompt with the task query.
+        sys_prompt (str): The system prompt to guide the model's response.
+        response_format (Type[ResumeAnalysis] | ResumeAnalysis): The format class or instance of response expected from the model.
+
+    Returns:
+        str: The generated response from the model.
+    
+    """
+    request = build_request(model, sys_prompt, user_prompt, response_format)
+
+    analysis: ResumeAnalysis = None
+
+    try:
+
+        # Rate limits (429) and server errors are retried with backoff; other errors fall through to the handler below
+        response = await retry_async(get_async_together_client().chat.completions.create, **request)
+        analysis = parse_response(response)
+    
+    except Exception as e:
+
+        print(f"Error in get_resume_analysis_async(): {e}")
+        analysis = ""  
+
+    return analysis
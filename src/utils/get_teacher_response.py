@@ -1,20 +1,107 @@
 import os
 import json
-from typing import Any, Dict, List, Type
+import time
+import asyncio
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Type
+from pydantic import TypeAdapter
 from together import Together
 from google import genai
 from google.genai import types
 from data_structures.analysis_data import ResumeAnalysis
+from utils.genai_client import get_genai_client
+from utils.retry import retry_async, get_status_code
 
-    
-def get_teacher_response(model:str, sys_prompt:str, user_prompt:str, response_format:Type[ResumeAnalysis] | ResumeAnalysis)->str:
-    """ This function takes a user prompt and a system prompt, and returns the generated response of the model specified.
+# Seconds to wait between two status checks of a batch job
+BATCH_POLL_INTERVAL = 30
+
+# States in which a batch job will not make any further progress
+BATCH_COMPLETED_STATES = {"JOB_STATE_SUCCEEDED", "JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED"}
+
+# Built once at import; validating the raw JSON bytes in Rust skips the json.loads + model_validate round trip
+RESUME_ANALYSIS_ADAPTER = TypeAdapter(ResumeAnalysis)
+
+# How long the provider keeps a cached system prompt alive
+SYSTEM_PROMPT_CACHE_TTL = "3600s"
+
+# Seconds between two extensions of the cache's TTL while a run is using it, well within SYSTEM_PROMPT_CACHE_TTL
+SYSTEM_PROMPT_CACHE_REFRESH_INTERVAL = 1200
+
+# HTTP status codes the provider answers with when the cached content is missing or has expired
+CACHE_UNAVAILABLE_STATUS_CODES = {400, 403, 404}
+
+def create_system_prompt_cache(model: str, sys_prompt: str, ttl: str = SYSTEM_PROMPT_CACHE_TTL) -> Optional[str]:
+    """ This function registers the system prompt with the provider's context cache so that it is not re-sent and re-processed with every request.
+
+    Args:
+        model (str): The model the cache is created for. Cached content can only be used with the same model.
+        sys_prompt (str): The system prompt to cache.
+        ttl (str): How long the cache is kept alive, e.g. "3600s".
+
+    Returns:
+        Optional[str]: The name of the cached content, or None if caching is not available (e.g. the prompt is below the provider's minimum cache size).
+    """
+    client = get_genai_client()
+
+    try:
+        cache = client.caches.create(
+            model=model,
+            config=types.CreateCachedContentConfig(system_instruction=sys_prompt, ttl=ttl),
+        )
+        return cache.name
+    except Exception as e:
+        print(f"Warning: Could not cache the system prompt, it will be sent with every request instead: {e}")
+        return None
+
+def is_cache_unavailable_error(error: Exception) -> bool:
+    """ This function decides whether a request failed because its cached content was not found or has expired.
+
+    Args:
+        error (Exception): The exception raised by the client.
+
+    Returns:
+        bool: True if the request should be sent again with the system prompt inlined.
+    """
+    return get_status_code(error) in CACHE_UNAVAILABLE_STATUS_CODES and "cache" in str(error).lower()
+
+async def keep_system_prompt_cache_alive(cached_content: str, ttl: str = SYSTEM_PROMPT_CACHE_TTL, interval: float = SYSTEM_PROMPT_CACHE_REFRESH_INTERVAL) -> None:
+    """ This function extends the TTL of a cache created with create_system_prompt_cache every interval seconds until it is cancelled,
+    so that the cache does not expire in the middle of a long run.
+
+    Args:
+        cached_content (str): The name of the cached content.
+        ttl (str): The TTL to set on every extension, e.g. "3600s".
+        interval (float): Seconds between two extensions.
+    """
+    client = get_genai_client()
+
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await client.aio.caches.update(name=cached_content, config=types.UpdateCachedContentConfig(ttl=ttl))
+        except Exception as e:
+            print(f"Warning: Could not extend the TTL of cached content {cached_content}: {e}")
+
+def delete_system_prompt_cache(cached_content: str) -> None:
+    """ This function deletes a cache created with create_system_prompt_cache so that it stops incurring storage costs.
+
+    Args:
+        cached_content (str): The name of the cached content.
+    """
+    try:
+        get_genai_client().caches.delete(name=cached_content)
+    except Exception as e:
+        print(f"Warning: Could not delete cached content {cached_content}: {e}")
+
+async def get_teacher_response(model:str, sys_prompt:str, user_prompt:str, response_format:Type[ResumeAnalysis] | ResumeAnalysis | Dict[str, Any], cached_content: Optional[str] = None)->str:
+    """ This function takes a user prompt and a system prompt, and asynchronously returns the generated response of the model specified.
     
     Args:
         model (str): The model to be used for analysis. Options:"Any model available through Google's Gemini API or Together.ai API".
         user_prompt (str): The user's input prompt with the task query.
         sys_prompt (str): The system prompt to guide the model's response.
-        response_format (Type[ResumeAnalysis] | ResumeAnalysis): The format class or instance of response expected from the model.
+        response_format (Type[ResumeAnalysis] | ResumeAnalysis | Dict[str, Any]): The format class or instance of response expected from the model, or its precomputed JSON schema (ResumeAnalysis.model_json_schema()) to avoid converting the model to a schema on every call.
+        cached_content (Optional[str]): Name of a cache holding the system prompt (see create_system_prompt_cache). If the cache is not found or has expired, the request is sent again with the system prompt inlined.
 
     Returns:
         str: The generated response from the model.
@@ -23,37 +110,114 @@ def get_teacher_response(model:str, sys_prompt:str, user_prompt:str, response_fo
     assert isinstance(model, str), "model name must be a string"
     assert isinstance(user_prompt, str), "user_prompt must be a string"
     assert isinstance(sys_prompt, str), "sys_prompt must be a string"
-    assert response_format == ResumeAnalysis or isinstance(response_format, ResumeAnalysis), "response_format must be a ResumeAnalysis class or instance"
+    assert response_format == ResumeAnalysis or isinstance(response_format, (ResumeAnalysis, dict)), "response_format must be a ResumeAnalysis class, instance or JSON schema"
     
     analysis: ResumeAnalysis = None
     
-    try:
-        GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-    except Exception as e:
-        print(f"Error: {e}")
-        exit()
+    client = get_genai_client()
 
-    client = genai.Client(api_key=GEMINI_API_KEY)
+    if isinstance(response_format, dict):
+        schema_config = {"response_json_schema": response_format}
+    else:
+        schema_config = {"response_schema": response_format}
        
     try:
 
-        response = client.models.generate_content(
+        # Transient errors (rate limits, 5xx, timeouts) are retried with backoff before falling back
+        response = await retry_async(
+            client.aio.models.generate_content,
             model=model,
             contents=[types.Part.from_text(text=user_prompt)],
             config=types.GenerateContentConfig(
-                system_instruction=sys_prompt,
+                system_instruction=None if cached_content else sys_prompt,
+                cached_content=cached_content,
                 response_mime_type='application/json',
-                response_schema=response_format,
-                temperature=0.1
+                temperature=0.1,
+                **schema_config
             ),
         )
         
-        analysis = response.parsed
+        if isinstance(response_format, dict):
+            analysis = RESUME_ANALYSIS_ADAPTER.validate_json(response.text)
+        else:
+            analysis = response.parsed
 
     except Exception as e:
+
+        if cached_content and is_cache_unavailable_error(e):
+            # The cache has expired or been evicted; send the system prompt with the request instead
+            return await get_teacher_response(model, sys_prompt, user_prompt, response_format)
         
         print("Error in get_model_response():", e)     
         analysis = ""
             
     return analysis
 
+def create_teacher_batch_request(custom_id: str, sys_prompt: str, user_prompt: str, response_format: Type[ResumeAnalysis] | ResumeAnalysis | Dict[str, Any]) -> Dict[str, Any]:
+    """ This function builds a single line of the JSONL input file of a Gemini batch job.
+
+    Args:
+        custom_id (str): The identifier used to match the response back to the request.
+        sys_prompt (str): The system prompt to guide the model's response.
+        user_prompt (str): The user's input prompt with the task query.
+        response_format (Type[ResumeAnalysis] | ResumeAnalysis | Dict[str, Any]): The format class or instance of response expected from the model, or its precomputed JSON schema.
+
+    Returns:
+        Dict[str, Any]: The batch request with its custom_id as the key.
+    """
+    return {
+        "key": custom_id,
+        "request": {
+            "contents": [{"role": "user", "parts": [{"text": user_prompt}]}],
+            "system_instruction": {"parts": [{"text": sys_prompt}]},
+            "generation_config": {
+                "response_mime_type": "application/json",
+                "response_json_schema": response_format if isinstance(response_format, dict) else response_format.model_json_schema(),
+                "temperature": 0.1
+            }
+        }
+    }
+
+def run_teacher_batch(model: str, requests_file_path: Path) -> Dict[str, Optional[str]]:
+    """ This function submits a JSONL file of requests as a Gemini batch job, waits for the job to finish and returns the generated responses.
+
+    Args:
+        model (str): The model to be used for analysis.
+        requests_file_path (Path): Path to the JSONL file with one request per line (see create_teacher_batch_request).
+
+    Returns:
+        Dict[str, Optional[str]]: The generated JSON text for each custom_id, or None for requests that failed.
+    """
+    client = get_genai_client()
+
+    uploaded_file = client.files.upload(
+        file=str(requests_file_path),
+        config=types.UploadFileConfig(display_name=Path(requests_file_path).stem, mime_type="jsonl"),
+    )
+    batch_job = client.batches.create(model=model, src=uploaded_file.name, config={"display_name": Path(requests_file_path).stem})
+    print(f"Created batch job: {batch_job.name}")
+
+    while batch_job.state.name not in BATCH_COMPLETED_STATES:
+        time.sleep(BATCH_POLL_INTERVAL)
+        batch_job = client.batches.get(name=batch_job.name)
+        print(f"Batch job state: {batch_job.state.name}")
+
+    if batch_job.state.name != "JOB_STATE_SUCCEEDED":
+        print(f"Error: batch job {batch_job.name} finished with state {batch_job.state.name}")
+        return {}
+
+    responses: Dict[str, Optional[str]] = {}
+    results = client.files.download(file=batch_job.dest.file_name).decode("utf-8")
+
+    for line in results.splitlines():
+        if not line.strip():
+            continue
+        result = json.loads(line)
+        try:
+            parts = result["response"]["candidates"][0]["content"]["parts"]
+            responses[result["key"]] = "".join(part.get("text", "") for part in parts)
+        except (KeyError, IndexError, TypeError):
+            print(f"Error in batch response for {result.get('key')}: {result.get('error')}")
+            responses[result.get("key")] = None
+
+    return responses
@@ -1,7 +1,57 @@
 import os
 import argparse
+import hashlib
+from pathlib import Path
 from typing import Dict
-from markitdown import MarkItDown
+
+# Where converted resumes are kept between runs (see parse_resume_cached)
+PARSED_RESUMES_CACHE_DIR = Path(__file__).resolve().parent.parent.parent / "data" / "cache" / "parsed_resumes"
+# Part of the cache key; bump it whenever the conversion output changes so stale cached text is not served
+PARSER_VERSION = 2
+
+def parse_docx(file_path: str) -> str:
+    """
+    Converts a .docx resume to Markdown by walking its paragraphs and tables with python-docx.
+    Much cheaper than MarkItDown, which goes through mammoth and HTML for .docx files.
+
+    Args:
+        file_path (str): The path to the .docx file.
+
+    Returns: A string containing the Markdown content of the resume.
+    """
+    from docx import Document
+    from docx.table import Table
+
+    document = Document(file_path)
+    parts = []
+
+    # iter_inner_content yields paragraphs and tables in document order
+    for block in document.iter_inner_content():
+        if isinstance(block, Table):
+            rows = [[cell.text.strip().replace("\n", " ") for cell in row.cells] for row in block.rows]
+            if rows:
+                header, body = rows[0], rows[1:]
+                lines = ["| " + " | ".join(header) + " |", "| " + " | ".join("---" for _ in header) + " |"]
+                lines += ["| " + " | ".join(row) + " |" for row in body]
+                parts.append("\n".join(lines))
+            continue
+
+        text = block.text.strip()
+        if not text:
+            continue
+        style = block.style.name if block.style is not None else ""
+        if style.startswith("Heading") and style[len("Heading"):].strip().isdigit():
+            parts.append("#" * int(style[len("Heading"):]) + " " + text)
+        elif style == "Title":
+            parts.append("# " + text)
+        # Bullets are often applied as direct numbering on a "Normal" paragraph rather than through a List style;
+        # python-docx has no public API for paragraph numbering, so check the underlying <w:numPr> element
+        elif style.startswith("List") or (block._p.pPr is not None and block._p.pPr.numPr is not None):
+            parts.append("* " + text)
+        else:
+            parts.append(text)
+
+    return "\n\n".join(parts)
 
 def parse_resume(file_path: str) -> Dict:
     """ 
@@ -15,7 +65,16 @@ def parse_resume(file_path: str) -> Dict:
 
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"The file {file_path} does not exist.")
-    
+
+    # Fast path for .docx; anything else (or a .docx python-docx can't read) goes through MarkItDown
+    if Path(file_path).suffix.lower() == ".docx":
+        try:
+            return parse_docx(file_path)
+        except Exception as e:
+            print(f"Error converting file {file_path} with python-docx, falling back to MarkItDown: {e}")
+
+    from markitdown import MarkItDown
+
     # Initialize MarkItDown with plugins disabled
     md = MarkItDown(enable_plugins=False)  # Set to True to enable plugins
     file_content: str = None
@@ -29,6 +88,34 @@ def parse_resume(file_path: str) -> Dict:
     
     return file_content
 
+def parse_resume_cached(file_path: str, cache_dir: Path = PARSED_RESUMES_CACHE_DIR) -> Dict:
+    """
+    Same as parse_resume, but keeps the converted Markdown on disk so each file is only converted once.
+    Entries are keyed by the file's path, modification time and size and by PARSER_VERSION, so an edited resume
+    (or a change to the converter) leads to a fresh conversion.
+
+    Args:
+        file_path (str): The path to the resume file.
+        cache_dir (Path): The folder holding the converted resumes.
+
+    Returns: A string containing the Markdown content of the resume.
+    """
+    stat = os.stat(file_path)
+    key = hashlib.blake2b(f"{PARSER_VERSION}:{Path(file_path).resolve()}:{stat.st_mtime_ns}:{stat.st_size}".encode()).hexdigest()
+    cache_file_path = Path(cache_dir) / f"{key}.md"
+
+    if cache_file_path.exists():
+        return cache_file_path.read_text(encoding="utf-8")
+
+    file_content = parse_resume(file_path)
+
+    # Failed conversions are not cached so that they are retried on the next run
+    if file_content is not None:
+        cache_file_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_file_path.write_text(file_content, encoding="utf-8")
+
+    return file_content
+
 def main():
     """
     Main function to parse a resume file and print the Markdown content.
@@ -1,9 +1,11 @@
 import os
 import sys
 import json
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
-SYSTEM_PROMPT = """# Identity
+# The system prompt is kept in parts: the full SYSTEM_PROMPT (used for fine-tuning and the fine-tuned models) embeds
+# SCHEMA_EXAMPLES, while SYSTEM_PROMPT_SHORT leaves them out for calls where the API enforces the response schema
+_SYSTEM_PROMPT_RULES = """# Identity
 
 You are a helpful assistant and an expert in Resume Screening.
 
@@ -31,7 +33,9 @@ Master's is preferred, Experience with PyTorch or Tensorflow, TensorRT and CUDA
   Any omissions, misclassifications, or incomplete extractions here will lead to incorrect matches and poor final outcomes.
   Pay careful attention.
 
-* <STRUCTURED_JOB_DESCRIPTION_DATA> example:
+"""
+
+SCHEMA_EXAMPLES = """* <STRUCTURED_JOB_DESCRIPTION_DATA> example:
 {
     "job_title": Software Engineer,
     "location": [New York, NY],
@@ -104,7 +108,9 @@ Master's is preferred, Experience with PyTorch or Tensorflow, TensorRT and CUDA
     }
 }
 
-* Be precise and exhaustive when filling in these structured data fields.
+"""
+
+_SYSTEM_PROMPT_OUTPUT = """* Be precise and exhaustive when filling in these structured data fields.
   These are not optional summaries — they are the foundation for automated matching and carry critical weight.
   Do not skip or shortcut any category, even if the source data is incomplete; always reflect missing or absent items clearly (e.g., with empty lists, empty strings or null).
 
@@ -149,6 +155,12 @@ Do not include any extra commentary, explanations, or formatting outside the JSO
 
 """
 
+SYSTEM_PROMPT = _SYSTEM_PROMPT_RULES + SCHEMA_EXAMPLES + _SYSTEM_PROMPT_OUTPUT
+
+SYSTEM_PROMPT_SHORT = _SYSTEM_PROMPT_RULES + """* The fields of <STRUCTURED_RESUME_DATA> and <STRUCTURED_JOB_DESCRIPTION_DATA> are defined by the response schema.
+
+""" + _SYSTEM_PROMPT_OUTPUT
+
 DISTILLATION_USER_PROMPT = """ You are provided with the following:
 
 Resume: \n{RESUME_TEXT}
@@ -222,4 +234,12 @@ def get_test_user_prompt(resume_text: str, job_description_text: str) -> str:
     return INFERENCE_USER_PROMPT.format(
         RESUME_TEXT=resume_text.strip(),
         JOB_DESCRIPTION_TEXT=job_description_text.strip(),
-    )
\ No newline at end of file
+    )
+
+# The inference prompt split around the job description, so the resume part is only formatted once per resume
+_INFERENCE_USER_PROMPT_HEAD, _INFERENCE_USER_PROMPT_TAIL = INFERENCE_USER_PROMPT.split("{JOB_DESCRIPTION_TEXT}")
+
+def get_test_user_prompt_parts(resume_text: str) -> Tuple[str, str]:
+    # prefix + job_description_text.strip() + suffix == get_test_user_prompt(resume_text, job_description_text)
+    prefix = _INFERENCE_USER_PROMPT_HEAD.format(RESUME_TEXT=resume_text.strip())
+    return prefix, _INFERENCE_USER_PROMPT_TAIL
\ No newline at end of file
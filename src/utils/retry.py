@@ -0,0 +1,119 @@
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Optional
+import httpx
+
+# HTTP status codes of transient failures (timeouts, rate limits, server errors) that are worth retrying
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+# Total number of attempts, including the first one
+MAX_ATTEMPTS = 5
+
+# Bounds (in seconds) of the exponential backoff between attempts
+MIN_WAIT = 1
+MAX_WAIT = 30
+
+def get_status_code(error: Exception) -> Optional[int]:
+    """ This function extracts the HTTP status code from an exception raised by the Gemini, Together.ai or httpx clients.
+
+    Args:
+        error (Exception): The exception raised by the client.
+
+    Returns:
+        Optional[int]: The HTTP status code, or None if the exception does not carry one.
+    """
+    for attribute in ("code", "status_code", "http_status"):
+        value = getattr(error, attribute, None)
+        if isinstance(value, int):
+            return value
+
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None)
+
+def is_retryable_error(error: Exception) -> bool:
+    """ This function decides whether a failed request should be retried. Network errors, timeouts, rate limits and
+    server errors are retried; client errors such as 400 (e.g. a bad schema) are not, since they would fail again.
+
+    Args:
+        error (Exception): The exception raised by the client.
+
+    Returns:
+        bool: True if the request should be retried.
+    """
+    if isinstance(error, (httpx.TransportError, ConnectionError, TimeoutError, asyncio.TimeoutError)):
+        return True
+
+    return get_status_code(error) in RETRYABLE_STATUS_CODES
+
+def get_backoff_delay(attempt: int) -> float:
+    """ This function returns how long to wait before the next attempt, using exponential backoff with jitter.
+    The delay is drawn between MIN_WAIT and the exponential bound (capped at MAX_WAIT), so a retry never fires immediately.
+
+    Args:
+        attempt (int): The number of attempts made so far, starting at 0.
+
+    Returns:
+        float: The delay in seconds.
+    """
+    return random.uniform(MIN_WAIT, min(MAX_WAIT, MIN_WAIT * 2 ** attempt))
+
+def get_retry_delay(error: Exception, attempt: int, max_attempts: int) -> float:
+    """ This function decides what to do after a failed attempt, for both retry_async and retry_with_backoff.
+
+    Args:
+        error (Exception): The exception raised by the attempt.
+        attempt (int): The number of the failed attempt, starting at 0.
+        max_attempts (int): The total number of attempts before giving up.
+
+    Returns:
+        float: How long to wait (in seconds) before the next attempt.
+
+    Raises:
+        Exception: The error itself, if it is not retryable or this was the last attempt.
+    """
+    if attempt == max_attempts - 1 or not is_retryable_error(error):
+        raise error
+    delay = get_backoff_delay(attempt)
+    print(f"Warning: Request failed with a transient error, retrying in {delay:.1f}s ({attempt + 1}/{max_attempts}): {error}")
+    return delay
+
+async def retry_async(func: Callable[..., Awaitable[Any]], *args, max_attempts: int = MAX_ATTEMPTS, **kwargs) -> Any:
+    """ This function awaits func(*args, **kwargs) and retries it with exponential backoff and jitter on transient errors.
+
+    Args:
+        func (Callable[..., Awaitable[Any]]): The coroutine function to call.
+        max_attempts (int): The total number of attempts before giving up.
+
+    Returns:
+        Any: The result of func.
+
+    Raises:
+        Exception: The last error, once it is not retryable or all attempts are exhausted.
+    """
+    for attempt in range(max_attempts):
+        try:
+            return await func(*args, **kwargs)
+        except Exception as e:
+            await asyncio.sleep(get_retry_delay(e, attempt, max_attempts))
+
+
+def retry_with_backoff(func: Callable[..., Any], *args, max_attempts: int = MAX_ATTEMPTS, **kwargs) -> Any:
+    """ This function calls func(*args, **kwargs) and retries it with exponential backoff and jitter on transient errors.
+    It is the blocking counterpart of retry_async, for the synchronous clients.
+
+    Args:
+        func (Callable[..., Any]): The function to call.
+        max_attempts (int): The total number of attempts before giving up.
+
+    Returns:
+        Any: The result of func.
+
+    Raises:
+        Exception: The last error, once it is not retryable or all attempts are exhausted.
+    """
+    for attempt in range(max_attempts):
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            time.sleep(get_retry_delay(e, attempt, max_attempts))
\ No newline at end of file